@@ -4,15 +4,13 @@
 aggregate_results.py — Aggregate all SEILDR model outputs into summary table
 """
 
+import argparse
 import numpy as np
 import pandas as pd
 import os
 import glob
 import re
 
-# Output directory for CSV summaries
-os.makedirs("results/summaries", exist_ok=True)
-
 # Metadata extraction helper
 def extract_metadata(filename):
     basename = os.path.basename(filename)
@@ -22,13 +20,31 @@ def extract_metadata(filename):
     scenario, mortality, infectious, latent = match.groups()
     return scenario, float(mortality), int(infectious), int(latent)
 
-records = []
-files = glob.glob("results/*.npy")
+def summarise_events(events):
+    extinct = events["extinction_day"] >= 0
+    summary = {
+        "extinction_prob": np.mean(extinct),
+        "mean_extinction_day": np.mean(events["extinction_day"][extinct]) if extinct.any() else np.nan,
+    }
+    # Event files written before fade-out was tracked lack the field
+    if "fadeout_day" in events.dtype.names:
+        faded = events["fadeout_day"] >= 0
+        summary["fadeout_prob"] = np.mean(faded)
+        summary["mean_fadeout_day"] = np.mean(events["fadeout_day"][faded]) if faded.any() else np.nan
+    return {
+        **summary,
+        "mean_peak_infectious": np.mean(events["peak_infectious"]),
+        "mean_peak_day": np.mean(events["peak_day"]),
+        "mean_total_infections": np.mean(events["total_infections"]),
+        "mean_reactivations": np.mean(events["reactivations"]),
+        "mean_aviaries_infected": np.mean(events["aviaries_infected"])
+    }
 
-if not files:
-    print("No simulation result files found in /results/")
-else:
-    for filepath in sorted(files):
+def aggregate(results_dir="results"):
+    records = []
+    for filepath in sorted(glob.glob(os.path.join(results_dir, "*.npy"))):
+        if filepath.endswith("_events.npy"):
+            continue
         meta = extract_metadata(filepath)
         if not meta:
             print(f"Skipping unrecognized file: {filepath}")
@@ -44,19 +60,44 @@ else:
         upper_final = np.percentile(final_cumulative, 97.5)
         std_final = np.std(final_cumulative)
 
-        records.append({
+        record = {
             "scenario": scenario,
             "mortality": mortality,
             "initial_infectious": infectious,
             "initial_latent": latent,
+            "repeats": len(final_cumulative),
             "mean_deaths": mean_final,
             "lower_deaths": lower_final,
             "upper_deaths": upper_final,
             "std_deaths": std_final
-        })
+        }
+
+        # In-engine event metrics, when the batch runner stored them
+        events_path = filepath[:-len(".npy")] + "_events.npy"
+        if os.path.exists(events_path):
+            record.update(summarise_events(np.load(events_path)))
+
+        records.append(record)
+
+    return pd.DataFrame(records)
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Aggregate SEILDR result files into a summary CSV")
+    parser.add_argument("--results", type=str, default="results", help="Directory holding simulation .npy files")
+    args = parser.parse_args(argv)
+
+    # Output directory for CSV summaries
+    summary_dir = os.path.join(args.results, "summaries")
+    os.makedirs(summary_dir, exist_ok=True)
+
+    df = aggregate(args.results)
+    if df.empty:
+        print(f"No simulation result files found in /{args.results}/")
+        return
 
-    df = pd.DataFrame(records)
-    out_path = "results/summaries/aggregate_summary.csv"
+    out_path = os.path.join(summary_dir, "aggregate_summary.csv")
     df.to_csv(out_path, index=False)
     print(f"Aggregated {len(df)} simulation results into {out_path}")
 
+if __name__ == "__main__":
+    main()
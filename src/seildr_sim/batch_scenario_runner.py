@@ -4,10 +4,12 @@
 batch_scenario_runner.py — Fully package-aligned, parallel batch runner
 """
 
+import argparse
+import json
 import pandas as pd
 import numpy as np
 import os
-from seildr_sim.core_model import run_simulation
+from seildr_sim.core_model import run_simulation, iter_batched, precision_info
 from seildr_sim.path_resolver import resolve_scenarios_path
 from tqdm import tqdm
 
@@ -21,55 +23,187 @@ SCENARIOS = {
 }
 
 # ---------------------------------------
-# Load scenario grid
+# Scenario grid helpers
 # ---------------------------------------
-scenario_path = resolve_scenarios_path()
-if not os.path.exists(scenario_path):
-    raise FileNotFoundError(f"Cannot find scenarios.csv at: {scenario_path}")
 
-df = pd.read_csv(scenario_path)
+def load_scenarios(scenario_path=None):
+    scenario_path = scenario_path or resolve_scenarios_path()
+    if not os.path.exists(scenario_path):
+        raise FileNotFoundError(f"Cannot find scenarios.csv at: {scenario_path}")
+    return pd.read_csv(scenario_path)
 
-# ---------------------------------------
-# Ensure output directory exists
-# ---------------------------------------
-os.makedirs("results", exist_ok=True)
+def row_to_params(row):
+    """
+    Translates one scenarios.csv row into run_simulation keyword arguments.
+
+    Returns None for scenarios missing from SCENARIOS.
+    """
+    scenario_name = row["scenario"]
+    if scenario_name not in SCENARIOS:
+        return None
+
+    return {
+        "initial_infectious": int(row["initial_infectious"]),
+        "initial_latent": int(row["initial_latent"]),
+        "beta_within": SCENARIOS[scenario_name]["beta_within"],
+        "beta_cross": SCENARIOS[scenario_name]["beta_cross"],
+        "mortality_rate": float(row["mortality"]),
+        "reactivation_daily_p": float(row["reactivation"]),
+        "repeats": int(row["repeats"]),
+        "days": int(row["days"]),
+        "n_cores": int(row["cores"]) if "cores" in row and not pd.isna(row["cores"]) else 10
+    }
+
+def precision_params(row, defaults):
+    """
+    Precision-mode settings for one row: optional scenarios.csv columns
+    (precision, extinction_precision, fadeout_precision, min_repeats,
+    max_repeats, batch_size) override the command-line defaults.
+    """
+    settings = {}
+    for key, cast in (("precision", float), ("extinction_precision", float), ("fadeout_precision", float),
+                      ("min_repeats", int), ("max_repeats", int), ("batch_size", int)):
+        value = row[key] if key in row and not pd.isna(row[key]) else defaults.get(key)
+        settings[key] = None if value is None else cast(value)
+    return settings
+
+def result_filename(scenario_name, mortality, initial_infectious, initial_latent):
+    return f"{scenario_name}_m{mortality}_i{initial_infectious}_l{initial_latent}.npy"
+
+def events_filename(result_path):
+    # Per-replicate event metrics (core_model.EVENT_DTYPE) stored beside the daily deaths
+    return str(result_path)[:-len(".npy")] + "_events.npy"
+
+def run_metadata(scenario_name, params, info):
+    """
+    JSON-ready run metadata: parameters plus achieved precision. Non-finite
+    values (e.g. the CI half-width of a single replicate) become null.
+    """
+    info = {k: None if isinstance(v, float) and not np.isfinite(v) else v for k, v in info.items()}
+    return {"scenario": scenario_name, "parameters": params, **info}
+
+def save_result(results_dir, scenario_name, params, deaths, events, info):
+    """
+    Writes the daily deaths, event metrics and run metadata of one row.
+
+    Returns:
+        str: path of the saved .npy.
+    """
+    outfile = os.path.join(results_dir, result_filename(
+        scenario_name, params["mortality_rate"], params["initial_infectious"], params["initial_latent"]
+    ))
+    np.save(outfile, deaths)
+    np.save(events_filename(outfile), events)
+
+    # Run metadata (parameters, replicate count, achieved precision) beside the results
+    with open(outfile[:-len(".npy")] + "_meta.json", "w") as f:
+        json.dump(run_metadata(scenario_name, params, info), f, indent=2, allow_nan=False)
+    return outfile
+
+def run_grid(df, seed=None, n_cores=10, memory_mb=256):
+    """
+    Runs every known scenarios.csv row through the parameter-batched engine
+    (core_model.iter_batched) as one computation.
+
+    Yields:
+        (index, dict, numpy.ndarray, numpy.ndarray): df index label,
+        run_simulation parameters, daily deaths and event metrics, for each
+        row as soon as all its replicates are done.
+    """
+    rows = []
+    for idx, row in df.iterrows():
+        params = row_to_params(row)
+        if params is None:
+            print(f"Skipping unknown scenario '{row['scenario']}'")
+            continue
+        params.pop("n_cores")
+        rows.append((idx, params))
+
+    for k, deaths, events in iter_batched([params for _, params in rows], seed, n_cores, memory_mb):
+        idx, params = rows[k]
+        yield idx, params, deaths, events
 
 # ---------------------------------------
 # Batch loop with progress bar
 # ---------------------------------------
-for idx, row in tqdm(df.iterrows(), total=len(df), desc="Batch Progress", unit="scenario"):
-    scenario_name = row["scenario"]
 
-    if scenario_name not in SCENARIOS:
-        print(f"Skipping unknown scenario '{scenario_name}'")
-        continue
-
-    beta_within = SCENARIOS[scenario_name]["beta_within"]
-    beta_cross = SCENARIOS[scenario_name]["beta_cross"]
-
-    initial_infectious = int(row["initial_infectious"])
-    initial_latent = int(row["initial_latent"])
-    mortality = float(row["mortality"])
-    reactivation = float(row["reactivation"])
-    repeats = int(row["repeats"])
-    days = int(row["days"])
-    cores = int(row["cores"]) if "cores" in row and not pd.isna(row["cores"]) else 10
-
-    print(f"\n--- Running scenario: {scenario_name} | m={mortality} | i={initial_infectious} | l={initial_latent} ---")
-    print(f"Beta: within={beta_within}, cross={beta_cross} | Using {cores} cores.")
-
-    results = run_simulation(
-        initial_infectious=initial_infectious,
-        initial_latent=initial_latent,
-        beta_within=beta_within,
-        beta_cross=beta_cross,
-        mortality_rate=mortality,
-        reactivation_daily_p=reactivation,
-        repeats=repeats,
-        days=days,
-        n_cores=cores
-    )
-
-    outfile = f"results/{scenario_name}_m{mortality}_i{initial_infectious}_l{initial_latent}.npy"
-    np.save(outfile, results)
-    print(f"Saved: {outfile}")
\ No newline at end of file
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Run every scenario in scenarios.csv")
+    parser.add_argument("--scenarios", type=str, help="Scenario grid CSV (defaults to packaged scenarios.csv)")
+    parser.add_argument("--results", type=str, default="results", help="Output directory for .npy files")
+    parser.add_argument("--precision", type=float,
+                        help="Stop adding replicates once the 95%% CI half-width of final deaths is below this")
+    parser.add_argument("--fadeout-precision", type=float,
+                        help="Also require this CI half-width on the fade-out probability (no E or I birds at the end)")
+    parser.add_argument("--extinction-precision", type=float,
+                        help="Also require this CI half-width on the extinction probability (no E, I or L birds); "
+                             "usually 0 with latent carriers, so prefer --fadeout-precision")
+    parser.add_argument("--min-repeats", type=int, help="First batch in precision mode (default min(100, repeats))")
+    parser.add_argument("--max-repeats", type=int, help="Replicate cap in precision mode (default the row's repeats)")
+    parser.add_argument("--batch-size", type=int, help="Replicates added per precision step (default min-repeats)")
+    parser.add_argument("--batched", action="store_true",
+                        help="Advance all rows and replicates together in the parameter-batched engine")
+    parser.add_argument("--cores", type=int, default=10, help="Worker processes for --batched")
+    parser.add_argument("--memory-mb", type=int, default=256, help="Engine memory per worker for --batched")
+    parser.add_argument("--seed", type=int, help="Base seed for --batched")
+    parser.add_argument("--screen", action="store_true",
+                        help="Cap replicates of rows the mean-field engine marks clearly extinct or catastrophic")
+    parser.add_argument("--screen-low", type=float,
+                        help="Mean-field deaths below which a row is clearly extinct (default: 10%% grid quantile)")
+    parser.add_argument("--screen-high", type=float,
+                        help="Mean-field deaths above which a row is clearly catastrophic (default: 90%% grid quantile)")
+    parser.add_argument("--screen-repeats", type=int, default=50, help="Repeats kept for screened rows")
+    args = parser.parse_args(argv)
+    if args.batched and any(v is not None for v in (args.precision, args.extinction_precision, args.fadeout_precision)):
+        parser.error("--batched runs the fixed repeats of each row; drop the precision targets")
+    defaults = {
+        "precision": args.precision,
+        "extinction_precision": args.extinction_precision,
+        "fadeout_precision": args.fadeout_precision,
+        "min_repeats": args.min_repeats,
+        "max_repeats": args.max_repeats,
+        "batch_size": args.batch_size
+    }
+
+    df = load_scenarios(args.scenarios)
+    os.makedirs(args.results, exist_ok=True)
+
+    if args.screen:
+        from seildr_sim.screening import screen_scenarios
+        df = screen_scenarios(df, args.screen_low, args.screen_high, args.screen_repeats)
+        counts = df["screen"].value_counts()
+        print("Mean-field screen: " + ", ".join(f"{k}={v}" for k, v in counts.items()))
+
+    if args.batched:
+        progress = tqdm(total=len(df), desc="Batch Progress", unit="scenario")
+        for idx, params, results, events in run_grid(df, args.seed, args.cores, args.memory_mb):
+            info = precision_info(np.sum(results, axis=1), events["extinction_day"] >= 0, faded=events["fadeout_day"] >= 0)
+            save_result(args.results, df.loc[idx, "scenario"], params, results, events, info)
+            progress.update()
+        progress.close()
+        print(f"Saved {progress.n} scenarios to {args.results}/")
+        return
+
+    for idx, row in tqdm(df.iterrows(), total=len(df), desc="Batch Progress", unit="scenario"):
+        scenario_name = row["scenario"]
+        params = row_to_params(row)
+
+        if params is None:
+            print(f"Skipping unknown scenario '{scenario_name}'")
+            continue
+
+        mortality = params["mortality_rate"]
+        initial_infectious = params["initial_infectious"]
+        initial_latent = params["initial_latent"]
+
+        print(f"\n--- Running scenario: {scenario_name} | m={mortality} | i={initial_infectious} | l={initial_latent} ---")
+        print(f"Beta: within={params['beta_within']}, cross={params['beta_cross']} | Using {params['n_cores']} cores.")
+
+        settings = precision_params(row, defaults)
+        results, events, info = run_simulation(**params, **settings, output="both", return_info=True)
+
+        outfile = save_result(args.results, scenario_name, params, results, events, info)
+        print(f"Saved: {outfile} ({info['repeats']} replicates, CI half-width {info['ci_halfwidth']:.2f})")
+
+if __name__ == "__main__":
+    main()
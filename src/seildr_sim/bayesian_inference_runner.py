@@ -11,25 +11,29 @@ import matplotlib.pyplot as plt
 import os
 from seildr_sim import bayesian_model  # Package-relative import
 
-# Ensure output directory exists
-os.makedirs("results", exist_ok=True)
+def main():
+    # Ensure output directory exists
+    os.makedirs("results", exist_ok=True)
 
-print("Starting Bayesian inference using PyMC5...")
-with bayesian_model.model:
-    trace = pm.sample(
-        draws=4000, 
-        tune=4000, 
-        target_accept=0.95, 
-        cores=10
-    )
+    print("Starting Bayesian inference using PyMC5...")
+    with bayesian_model.build_model():
+        trace = pm.sample(
+            draws=4000, 
+            tune=4000, 
+            target_accept=0.95, 
+            cores=10
+        )
 
-print("Sampling complete. Generating trace plots...")
-az.plot_trace(trace)
-plt.show()
+    print("Sampling complete. Generating trace plots...")
+    az.plot_trace(trace)
+    plt.show()
 
-summary = az.summary(trace)
-print("\nPosterior Summary:\n", summary)
+    summary = az.summary(trace)
+    print("\nPosterior Summary:\n", summary)
 
-summary_path = "results/bayesian_inference_summary.csv"
-summary.to_csv(summary_path)
-print(f"\nSummary written to: {summary_path}")
+    summary_path = "results/bayesian_inference_summary.csv"
+    summary.to_csv(summary_path)
+    print(f"\nSummary written to: {summary_path}")
+
+if __name__ == "__main__":
+    main()
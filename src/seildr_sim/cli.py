@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+cli.py — Unified `seildr` command line entry point
+
+Description:
+---------------------------------------
+Dispatches subcommands to the pipeline modules. Nothing heavy is imported
+here: each subcommand imports its own module only once selected, so
+`seildr simulate --help` never touches PyMC, seaborn or matplotlib, and
+simulation worker processes stay lean.
+
+Usage examples:
+---------------------------------------
+    seildr simulate --scenario isolation_only --repeats 1000 --cores 8
+    seildr batch
+    seildr aggregate
+    seildr plot
+    seildr infer --draws 2000
+    seildr predict --draws 500
+    seildr serve
+
+Run `seildr <command> --help` for the options of each command.
+"""
+
+import importlib
+import os
+import subprocess
+import sys
+
+# Subcommand -> (module implementing main(argv), one-line description)
+COMMANDS = {
+    "simulate": ("seildr_sim.simulate_runner", "Run one scenario (interactive when no options are given)"),
+    "batch": ("seildr_sim.batch_scenario_runner", "Run every scenario in scenarios.csv"),
+    "queue": ("seildr_sim.work_queue", "Multi-node batch runs over a shared-directory work queue"),
+    "aggregate": ("seildr_sim.aggregate_results", "Collapse result files into aggregate_summary.csv"),
+    "plot": ("seildr_sim.multi_panel_analytics", "Heatmaps, threshold and stability maps"),
+    "generate": ("seildr_sim.generate_scenarios_csv", "Regenerate the factorial scenarios.csv grid"),
+    "sensitivity": ("seildr_sim.sensitivity", "Sobol global sensitivity analysis"),
+    "screen": ("seildr_sim.screening", "Mean-field screening and mean-field vs stochastic report"),
+    "infer": ("seildr_sim.inference_runner", "Bayesian (PyMC) inference on exported deaths"),
+    "predict": ("seildr_sim.posterior_predictive", "Posterior predictive bands through the stochastic engine"),
+    "serve": (None, "Launch the Streamlit interactive simulator")
+}
+
+def _usage():
+    from seildr_sim import __version__
+    lines = [
+        f"seildr {__version__} — SEILDR avian herpesvirus simulation pipeline",
+        "",
+        "usage: seildr <command> [options]",
+        "",
+        "commands:"
+    ]
+    width = max(len(name) for name in COMMANDS)
+    lines += [f"  {name.ljust(width)}  {description}" for name, (_, description) in COMMANDS.items()]
+    lines += ["", "Run `seildr <command> --help` for command options."]
+    return "\n".join(lines)
+
+def serve(argv):
+    """
+    Starts Streamlit on scenario_simulator.py; extra arguments go to `streamlit run`.
+    """
+    app = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenario_simulator.py")
+    return subprocess.call([sys.executable, "-m", "streamlit", "run", app, *argv])
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+
+    if not argv or argv[0] in ("-h", "--help"):
+        print(_usage())
+        return 0
+    if argv[0] == "--version":
+        from seildr_sim import __version__
+        print(__version__)
+        return 0
+
+    command, rest = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"seildr: unknown command '{command}'\n\n{_usage()}", file=sys.stderr)
+        return 2
+
+    if command == "serve":
+        return serve(rest)
+
+    module = importlib.import_module(COMMANDS[command][0])
+    module.main(rest, prog=f"seildr {command}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,94 +9,450 @@ Implements:
 - Cross-aviary vs within-aviary transmission
 - Mortality variation
 - Parallelized stochastic replicates (multiprocessing)
+- Optional per-day, per-aviary trajectory recording streamed to a memory-mapped .npy
+- Time-varying intervention schedules, with snapshot-and-fork branching of variants
+- Adaptive replicate counts that stop once a target precision is reached
+- In-engine per-replicate event metrics (fade-out and extinction days, epidemic peak, infections, reactivations)
+- Vectorised deterministic mean-field engine for fast screening of parameter grids
+- Parameter-batched stochastic engine advancing many scenarios and replicates in one state array
 
 Author: Julen Gamboa
 Date: 06/2025
 """
 
+import copy
+import json
+import os
 import numpy as np
 from multiprocessing import Pool
+from statistics import NormalDist
 
-def single_run(params):
-    (
-        initial_infectious, initial_latent, beta_within, beta_cross, 
-        mortality_rate, reactivation_daily_p, days
-    ) = params
+COMPARTMENT_SIZES = np.array([36, 11, 16, 8, 25, 10, 14, 7])
+COMPARTMENTS = ("S", "E", "I", "L", "D")
 
-    compartment_sizes = np.array([36, 11, 16, 8, 25, 10, 14, 7])
-    n_compartments = len(compartment_sizes)
+INCUBATION_DAYS = 5
+INFECTIOUS_DAYS = 10
 
-    S = compartment_sizes.copy()
-    E, I, L, D = [np.zeros(n_compartments, dtype=int) for _ in range(4)]
+# Per-replicate outbreak events accumulated by the engine (see event_metrics)
+EVENT_DTYPE = np.dtype([
+    ("extinction_day", np.int32),     # first day ending with no E, I or L birds; -1 if never
+    ("fadeout_day", np.int32),        # first day of the final stretch with no E or I birds (latent carriers
+                                      # may remain); -1 if the infection is still active at the end of the run
+    ("peak_infectious", np.int16),    # largest end-of-day infectious count
+    ("peak_day", np.int32),           # first day reaching that peak
+    ("total_infections", np.int32),   # seeded infectious birds + new exposures
+    ("reactivations", np.int32),      # latent -> infectious events
+    ("aviaries_infected", np.int8),   # aviaries that ever held exposed or infectious birds
+    ("total_deaths", np.int32)
+])
 
-    L += int(initial_latent)
-    S -= int(initial_latent)
+# Parameters an intervention schedule may change from a given day onwards
+SCHEDULABLE = ("beta_within", "beta_cross", "mortality_rate", "reactivation_daily_p")
 
-    I[0] = initial_infectious
-    S[0] -= initial_infectious
+# Upper bound on (parameter set, replicate) pairs per batched chunk. Throughput
+# per pair levels off around a thousand pairs, and a fixed bound keeps the
+# chunk layout (hence the results for a seed) independent of the core count.
+BATCH_CHUNK_PAIRS = 2048
 
-    I_timers = [[] for _ in range(n_compartments)]
-    E_timers = [[] for _ in range(n_compartments)]
-    I_timers[0].extend([10] * initial_infectious)
+# ---------------------------------------
+# Engine state
+# ---------------------------------------
 
-    daily_deaths = []
+def initial_compartments(initial_infectious, initial_latent, dtype=np.int64):
+    """
+    Starting S, I, L counts and cohort timers for a leading axis of runs.
 
-    for day in range(days):
-        deaths_today = 0
-        for i in range(n_compartments):
-            lambda_within = beta_within * I[i] / compartment_sizes[i]
-            infectious_others = np.sum(I) - I[i]
-            lambda_cross = beta_cross * infectious_others / np.sum(compartment_sizes)
-            lambda_total = lambda_within + lambda_cross
-
-            S[i] = max(0, S[i])
-            susceptibles = S[i]
-            prob_infection = 1 - np.exp(-lambda_total)
-            prob_infection = min(max(prob_infection, 0), 1)
-
-            new_exposed = np.random.binomial(susceptibles, prob_infection)
+    `initial_latent` carriers are seeded into every aviary and the
+    `initial_infectious` birds into the first one, finishing their
+    infectious period on day INFECTIOUS_DAYS - 1.
+
+    Returns:
+        tuple: S, I, L of shape (runs, aviaries), E_timers and I_timers.
+    """
+    initial_infectious = np.asarray(initial_infectious, dtype=dtype)
+    initial_latent = np.asarray(initial_latent, dtype=dtype)
+    n_runs = len(initial_infectious)
+    n_compartments = len(COMPARTMENT_SIZES)
+
+    S = np.tile(COMPARTMENT_SIZES, (n_runs, 1)).astype(dtype)
+    I = np.zeros((n_runs, n_compartments), dtype=dtype)
+    L = np.zeros((n_runs, n_compartments), dtype=dtype)
+
+    L += initial_latent[:, None]
+    S -= initial_latent[:, None]
+    I[:, 0] = initial_infectious
+    S[:, 0] -= initial_infectious
+
+    E_timers = np.zeros((n_runs, n_compartments, INCUBATION_DAYS), dtype=dtype)
+    I_timers = np.zeros((n_runs, n_compartments, INFECTIOUS_DAYS), dtype=dtype)
+    I_timers[:, 0, INFECTIOUS_DAYS - 1] = initial_infectious
+    return S, I, L, E_timers, I_timers
+
+def init_state(initial_infectious, initial_latent, seed=None):
+    """
+    Builds the full engine state for one replicate.
+
+    Exposed and infectious birds are tracked as per-aviary cohort counts in
+    ring buffers (slot `day % INCUBATION_DAYS` of E_timers leaves E on that
+    day, likewise for I_timers), which is equivalent to per-bird countdown
+    timers but can be copied cheaply. The state owns its random generator, so a deep copy (see
+    snapshot_state) reproduces the exact future of the replicate.
+    """
+    S, I, L, E_timers, I_timers = [
+        a[0] for a in initial_compartments([int(initial_infectious)], [int(initial_latent)])
+    ]
+    E, D = [np.zeros(len(COMPARTMENT_SIZES), dtype=np.int64) for _ in range(2)]
+
+    # Each replicate owns its generator; forked pool workers would otherwise
+    # inherit identical global RNG state and produce duplicated replicates.
+    return {
+        "S": S, "E": E, "I": I, "L": L, "D": D,
+        "E_timers": E_timers, "I_timers": I_timers,
+        "day": 0,
+        "rng": np.random.default_rng(seed),
+        "events": {
+            "extinction_day": -1,
+            "last_active_day": -1,
+            "peak_infectious": int(np.sum(I)),
+            "peak_day": 0,
+            "total_infections": int(initial_infectious),
+            "reactivations": 0,
+            "ever_infected": I > 0
+        }
+    }
+
+def snapshot_state(state):
+    """
+    Independent copy of an engine state (compartments, timers and RNG).
+    """
+    return copy.deepcopy(state)
+
+def _binomial(rng, n, p):
+    # Draws only where n > 0; most (replicate, aviary) cells are empty
+    out = np.zeros(len(n), dtype=np.int64)
+    idx = np.flatnonzero(n)
+    if idx.size:
+        out[idx] = rng.binomial(n[idx], np.broadcast_to(p, n.shape)[idx])
+    return out
+
+def _expected(n, p):
+    # Mean-field counterpart of _binomial
+    return n * p
+
+def advance_day(S, I, L, E_timers, I_timers, day, rates, draw):
+    """
+    One day of SEILDR transitions for the vectorised engines (batch_chunk and
+    mean_field).
+
+    Arrays carry a leading axis of independent runs (replicates or parameter
+    sets): S, I, L of shape (runs, aviaries), cohort ring buffers E_timers
+    (runs, aviaries, INCUBATION_DAYS) and I_timers (runs, aviaries,
+    INFECTIOUS_DAYS), all updated in place. Aviaries are updated in turn, so
+    infection pressure on later aviaries sees today's changes in earlier ones.
+
+    Args:
+        rates: the four SCHEDULABLE parameters, scalars or arrays over runs.
+        draw: draw(n, p) -> transitions out of n at probability p, either
+            binomial draws (stochastic engines) or n * p (mean field).
+
+    step_day spells out the same transitions on scalars, because numpy's
+    per-call overhead on single-run arrays makes this version over twice as
+    slow for one replicate. Both consume the generator in the same order, so
+    a one-pair batch_chunk reproduces single_run exactly; tests/test_engines.py
+    holds them to that.
+
+    Returns:
+        (numpy.ndarray, numpy.ndarray, numpy.ndarray): new exposures, deaths
+        and reactivations per run and aviary.
+    """
+    compartment_sizes = COMPARTMENT_SIZES
+    total_birds = np.sum(compartment_sizes)
+
+    # Timers are ring buffers: instead of shifting every cohort down one slot
+    # each day, the slot that empties today rotates with the day counter.
+    e_out, e_in = day % INCUBATION_DAYS, (day - 1) % INCUBATION_DAYS
+    i_out, i_in = day % INFECTIOUS_DAYS, (day - 1) % INFECTIOUS_DAYS
+
+    beta_within, beta_cross = rates["beta_within"], rates["beta_cross"]
+    mortality_rate, reactivation_daily_p = rates["mortality_rate"], rates["reactivation_daily_p"]
+    exposed, deaths, reactivated = (np.zeros_like(S) for _ in range(3))
+    infectious = I.sum(axis=1)
+    for i in range(len(compartment_sizes)):
+        I_i = I[:, i]
+        lambda_total = beta_within * I_i / compartment_sizes[i] + beta_cross * (infectious - I_i) / total_birds
+        prob_infection = np.clip(1 - np.exp(-lambda_total), 0, 1)
+
+        S[:, i] = np.maximum(S[:, i], 0)
+        new_exposed = draw(S[:, i], prob_infection)
+        S[:, i] -= new_exposed
+        E_timers[:, i, e_in] += new_exposed
+
+        # Count down incubation; the cohort with one day left progresses
+        progressed = E_timers[:, i, e_out].copy()
+        E_timers[:, i, e_out] = 0
+        I_timers[:, i, i_in] += progressed
+
+        finished = I_timers[:, i, i_out].copy()
+        I_timers[:, i, i_out] = 0
+        died = draw(finished, mortality_rate)
+        L[:, i] += finished - died
+
+        reactivations = draw(L[:, i], reactivation_daily_p)
+        L[:, i] -= reactivations
+        # Enters the slot emptied today, i.e. a full infectious period
+        I_timers[:, i, i_out] += reactivations
+
+        change = progressed - finished + reactivations
+        I[:, i] += change
+        infectious += change
+
+        exposed[:, i], deaths[:, i], reactivated[:, i] = new_exposed, died, reactivations
+    return exposed, deaths, reactivated
+
+def step_day(state, beta_within, beta_cross, mortality_rate, reactivation_daily_p):
+    """
+    Advances the state by one day in place.
+
+    Scalar twin of advance_day (see there); keep the two in step.
+
+    Returns:
+        int: deaths on that day.
+    """
+    S, E, I, L, D = state["S"], state["E"], state["I"], state["L"], state["D"]
+    E_timers, I_timers = state["E_timers"], state["I_timers"]
+    rng = state["rng"]
+    events = state["events"]
+    compartment_sizes = COMPARTMENT_SIZES
+    total_birds = np.sum(compartment_sizes)
+
+    # Timers are ring buffers: instead of shifting every cohort down one slot
+    # each day, the slot that empties today rotates with the day counter.
+    day = state["day"]
+    e_out = day % INCUBATION_DAYS
+    e_in = (day - 1) % INCUBATION_DAYS
+    i_out = day % INFECTIOUS_DAYS
+    i_in = (day - 1) % INFECTIOUS_DAYS
+
+    deaths_today = 0
+    for i in range(len(compartment_sizes)):
+        lambda_within = beta_within * I[i] / compartment_sizes[i]
+        infectious_others = np.sum(I) - I[i]
+        lambda_cross = beta_cross * infectious_others / total_birds
+        lambda_total = lambda_within + lambda_cross
+
+        S[i] = max(0, S[i])
+        susceptibles = S[i]
+        prob_infection = 1 - np.exp(-lambda_total)
+        prob_infection = min(max(prob_infection, 0), 1)
+
+        if susceptibles > 0 and prob_infection > 0:
+            new_exposed = rng.binomial(susceptibles, prob_infection)
             S[i] -= new_exposed
             E[i] += new_exposed
-            E_timers[i].extend([5] * new_exposed)
-
-            progressed, new_E_timers = [], []
-            for t in E_timers[i]:
-                t -= 1
-                if t <= 0:
-                    progressed.append(t)
-                else:
-                    new_E_timers.append(t)
-            E_timers[i] = new_E_timers
-            E[i] -= len(progressed)
-            I[i] += len(progressed)
-            I_timers[i].extend([10] * len(progressed))
-
-            finished, new_I_timers = [], []
-            for t in I_timers[i]:
-                t -= 1
-                if t <= 0:
-                    finished.append(t)
-                else:
-                    new_I_timers.append(t)
-            I_timers[i] = new_I_timers
-            I[i] -= len(finished)
-
-            for _ in finished:
-                if np.random.rand() < mortality_rate:
-                    D[i] += 1
-                    deaths_today += 1
-                else:
-                    L[i] += 1
-
-            reactivations = np.random.binomial(L[i], reactivation_daily_p)
+            E_timers[i, e_in] += new_exposed
+            events["total_infections"] += new_exposed
+
+        # Count down incubation; the cohort with one day left progresses
+        progressed = E_timers[i, e_out]
+        E_timers[i, e_out] = 0
+        E[i] -= progressed
+        I[i] += progressed
+        I_timers[i, i_in] += progressed
+
+        finished = I_timers[i, i_out]
+        I_timers[i, i_out] = 0
+        if finished > 0:
+            I[i] -= finished
+            died = rng.binomial(finished, mortality_rate)
+            D[i] += died
+            L[i] += finished - died
+            deaths_today += died
+
+        if L[i] > 0 and reactivation_daily_p > 0:
+            reactivations = rng.binomial(L[i], reactivation_daily_p)
             L[i] -= reactivations
             I[i] += reactivations
-            I_timers[i].extend([10] * reactivations)
+            # Enters the slot emptied today, i.e. a full infectious period
+            I_timers[i, i_out] += reactivations
+            events["reactivations"] += reactivations
+
+    infectious = int(np.sum(I))
+    if infectious > events["peak_infectious"]:
+        events["peak_infectious"] = infectious
+        events["peak_day"] = day
+    events["ever_infected"] |= (E > 0) | (I > 0)
+    if E.any() or I.any():
+        events["last_active_day"] = day
+    if events["extinction_day"] < 0 and is_extinct(state):
+        events["extinction_day"] = day
+
+    state["day"] += 1
+    return int(deaths_today)
+
+# ---------------------------------------
+# Intervention schedules
+# ---------------------------------------
+
+def normalize_schedule(schedule, days=None):
+    """
+    Validates an intervention schedule and sorts it by start day.
+
+    A schedule is a list of (day, {parameter: value}) changes; each change
+    holds from its day until the end of the run or a later change to the
+    same parameter. For example, isolation from day 30:
+
+        [(30, {"beta_within": 0.2, "beta_cross": 0.01})]
+
+    Changes on a negative day, or on or after `days` (the run length, when
+    given), would never take effect and are rejected.
+    """
+    if not schedule:
+        return []
+    changes = sorted(((int(day), dict(overrides)) for day, overrides in schedule), key=lambda c: c[0])
+    for day, overrides in changes:
+        if day < 0 or (days is not None and day >= days):
+            raise ValueError(f"Schedule day {day} is outside the run" + (f" of {days} days" if days is not None else ""))
+        unknown = set(overrides) - set(SCHEDULABLE)
+        if unknown:
+            raise ValueError(f"Schedule on day {day} sets unknown parameters: {sorted(unknown)}")
+    return changes
+
+def simulate_days(state, rates, until, schedule=None, daily_deaths=None, on_day=None):
+    """
+    Steps the state from its current day up to (not including) `until`.
+
+    `rates` holds the four SCHEDULABLE parameters in effect and is updated in
+    place as schedule changes come into force, so a partially simulated state
+    can be resumed with the same dict. On resume, pass only the changes still
+    to come: a change dated before the state's current day is rejected.
+    """
+    changes = normalize_schedule(schedule)
+    if changes and changes[0][0] < state["day"]:
+        raise ValueError(f"Schedule day {changes[0][0]} is before the state's current day {state['day']}")
+    daily_deaths = [] if daily_deaths is None else daily_deaths
+
+    for day in range(state["day"], until):
+        for change_day, overrides in changes:
+            if change_day == day:
+                rates.update(overrides)
+        daily_deaths.append(step_day(state, **rates))
+        if on_day is not None:
+            on_day(day, state)
+
+    return daily_deaths
+
+def is_extinct(state):
+    """
+    True once no exposed, infectious or latent birds remain anywhere, i.e.
+    the virus is gone and no further deaths are possible.
+    """
+    return not (state["E"].any() or state["I"].any() or state["L"].any())
+
+def event_metrics(state):
+    """
+    Event metrics of a replicate as a tuple matching EVENT_DTYPE.
+    """
+    events = state["events"]
+    return (
+        events["extinction_day"],
+        # Reactivations can rekindle a faded infection, so only the final
+        # E/I-free stretch counts
+        events["last_active_day"] + 1 if events["last_active_day"] < state["day"] - 1 else -1,
+        events["peak_infectious"],
+        events["peak_day"],
+        int(events["total_infections"]),
+        int(events["reactivations"]),
+        int(np.sum(events["ever_infected"])),
+        int(np.sum(state["D"]))
+    )
+
+def single_run(params, seed=None, record=None, schedule=None, return_metrics=False):
+    (
+        initial_infectious, initial_latent, beta_within, beta_cross, 
+        mortality_rate, reactivation_daily_p, days
+    ) = params
+
+    state = init_state(initial_infectious, initial_latent, seed)
+    rates = {
+        "beta_within": beta_within,
+        "beta_cross": beta_cross,
+        "mortality_rate": mortality_rate,
+        "reactivation_daily_p": reactivation_daily_p
+    }
+
+    on_day = None
+    if record is not None:
+        spec, replicate = record
+        every = spec["every"]
+        aviaries = spec["aviaries"]
+        trajectory = np.empty((len(range(0, days, every)), len(aviaries), len(COMPARTMENTS)), dtype=spec["dtype"])
 
-        daily_deaths.append(deaths_today)
+        def on_day(day, state):
+            if day % every == 0:
+                trajectory[day // every] = np.stack([state[c] for c in COMPARTMENTS], axis=1)[aviaries]
 
+    daily_deaths = simulate_days(state, rates, days, normalize_schedule(schedule, days), on_day=on_day)
+
+    if record is not None:
+        # Only this replicate's row is touched, so workers can write concurrently
+        out = np.load(spec["path"], mmap_mode="r+")
+        out[replicate] = trajectory
+        out.flush()
+        del out
+
+    if return_metrics:
+        return daily_deaths, event_metrics(state)
     return daily_deaths
 
+def _metrics_only(params, seed=None, record=None, schedule=None, return_metrics=True):
+    # Pool worker for output="metrics": keeps the daily series out of the result pipe
+    return single_run(params, seed, record, schedule, return_metrics=True)[1]
+
+def branch_run(params, variants, seed=None):
+    """
+    Simulates one replicate's baseline and forks every intervention variant
+    from a snapshot taken at its first scheduled day.
+
+    Days before a variant's branch day are shared with the baseline instead of
+    being re-simulated, and forks inherit the baseline RNG state, so variants
+    are compared under common random numbers.
+
+    Returns:
+        dict: variant name (plus "baseline") -> list of daily deaths.
+    """
+    (
+        initial_infectious, initial_latent, beta_within, beta_cross,
+        mortality_rate, reactivation_daily_p, days
+    ) = params
+
+    state = init_state(initial_infectious, initial_latent, seed)
+    rates = {
+        "beta_within": beta_within,
+        "beta_cross": beta_cross,
+        "mortality_rate": mortality_rate,
+        "reactivation_daily_p": reactivation_daily_p
+    }
+
+    if "baseline" in variants:
+        raise ValueError("'baseline' is reserved for the unmodified run")
+
+    by_branch_day = {}
+    for name, schedule in variants.items():
+        changes = normalize_schedule(schedule, days)
+        branch_day = changes[0][0] if changes else days
+        by_branch_day.setdefault(branch_day, []).append((name, changes))
+
+    daily_deaths = []
+    outputs = {}
+    for branch_day in sorted(by_branch_day):
+        simulate_days(state, rates, branch_day, daily_deaths=daily_deaths)
+        for name, changes in by_branch_day[branch_day]:
+            fork = snapshot_state(state)
+            outputs[name] = simulate_days(fork, dict(rates), days, changes, daily_deaths=list(daily_deaths))
+
+    outputs["baseline"] = simulate_days(state, rates, days, daily_deaths=daily_deaths)
+    return outputs
+
 def run_simulation(
     initial_infectious=7, 
     initial_latent=30, 
@@ -106,16 +462,465 @@ def run_simulation(
     reactivation_daily_p=1/3650, 
     repeats=500, 
     days=1095, 
-    n_cores=10
+    n_cores=10,
+    seed=None,
+    record_path=None,
+    record_every=1,
+    record_aviaries=None,
+    schedule=None,
+    precision=None,
+    extinction_precision=None,
+    fadeout_precision=None,
+    min_repeats=None,
+    max_repeats=None,
+    batch_size=None,
+    confidence=0.95,
+    output="deaths",
+    return_info=False
 ):
     """
     Runs multiple stochastic replicates in parallel.
 
+    With a precision target, a first batch of `min_repeats` (default
+    min(100, repeats)) runs, then further batches of `batch_size` (default
+    min_repeats) until the confidence-interval half-width of final
+    cumulative deaths is at most `precision` (and, if set, those of the
+    fade-out and extinction probabilities at most `fadeout_precision` and
+    `extinction_precision`), or `max_repeats` (default `repeats`) is reached.
+    Extinction also needs every latent carrier gone, which practically never
+    happens within a run, so its probability sits at 0 and the Wilson
+    half-width shrinks like z^2 / 2n regardless of the data;
+    `fadeout_precision` is the meaningful target for outbreak probability. Low-variance scenarios thus stop well
+    below their nominal replicate count.
+
+    Args:
+        seed: optional int or numpy.random.SeedSequence. When given, each
+            replicate receives an independent child seed so the whole batch
+            is reproducible regardless of how it is split across processes.
+        record_path: optional .npy path. When given, per-day, per-aviary
+            S/E/I/L/D counts of every replicate are written to a memory-mapped
+            array of shape (repeats, recorded_days, aviaries, 5); see
+            open_trajectory_file.
+        record_every: keep every n-th day of the trajectory (day 0 included).
+        record_aviaries: optional list of aviary indices to record (default all).
+        schedule: optional intervention schedule, a list of
+            (day, {parameter: value}) changes to beta_within, beta_cross,
+            mortality_rate or reactivation_daily_p; see normalize_schedule.
+        output: "deaths" for the daily death series, "metrics" for per-replicate
+            event metrics only (structured array with EVENT_DTYPE: extinction
+            and fade-out days, peak infectious count and day, total infections,
+            reactivations, aviaries ever infected, total deaths), or "both".
+        return_info: also return the achieved precision (see precision_info)
+            together with the targets and whether they were met.
+
+    Returns:
+        numpy.ndarray: shape (repeats, days) cumulative daily deaths, the
+        metrics array, or (deaths, metrics) for output="both"; with
+        return_info the precision dict is appended to the returned tuple.
+    """
+    adaptive = any(t is not None for t in (precision, extinction_precision, fadeout_precision))
+    if adaptive and record_path is not None:
+        raise ValueError("Trajectory recording needs a fixed number of repeats; drop precision targets or record_path")
+
+    if output not in ("deaths", "metrics", "both"):
+        raise ValueError(f"output must be 'deaths', 'metrics' or 'both', not {output!r}")
+
+    params = (initial_infectious, initial_latent, beta_within, beta_cross,
+              mortality_rate, reactivation_daily_p, days)
+    schedule = normalize_schedule(schedule, days)
+    want_deaths = output != "metrics"
+    want_metrics = output != "deaths" or return_info or extinction_precision is not None or fadeout_precision is not None
+    worker = single_run if want_deaths else _metrics_only
+    if adaptive and seed is not None and not isinstance(seed, np.random.SeedSequence):
+        # Successive batches spawn from one root so they never reuse seeds
+        seed = np.random.SeedSequence(seed)
+
+    records = [None] * repeats
+    if record_path is not None:
+        spec = open_trajectory_file(
+            record_path, repeats, days, record_every, record_aviaries,
+            max_count=COMPARTMENT_SIZES.max() + initial_latent + initial_infectious
+        )
+        records = [(spec, r) for r in range(repeats)]
+
+    def run_batch(pool, n, batch_records):
+        seeds = spawn_seeds(seed, n)
+        outputs = pool.starmap(worker, zip([params] * n, seeds, batch_records, [schedule] * n, [want_metrics] * n))
+        if want_deaths and want_metrics:
+            deaths, metrics = zip(*outputs)
+            return list(deaths), list(metrics)
+        return (outputs, []) if want_deaths else ([], outputs)
+
+    def precision_of(deaths, metrics):
+        metrics = np.array(metrics, dtype=EVENT_DTYPE)
+        final = np.sum(deaths, axis=1) if want_deaths else metrics["total_deaths"]
+        if not want_metrics:
+            return precision_info(final, confidence=confidence)
+        return precision_info(final, metrics["extinction_day"] >= 0, confidence, metrics["fadeout_day"] >= 0)
+
+    if adaptive:
+        max_repeats = max_repeats or repeats
+        min_repeats = min(min_repeats or min(100, repeats), max_repeats)
+        batch_size = batch_size or min_repeats
+        repeats = min_repeats
+        records = records[:repeats]
+
+    with Pool(processes=n_cores) as pool:
+        deaths, metrics = run_batch(pool, repeats, records)
+
+        if adaptive:
+            while repeats < max_repeats:
+                if _precision_met(precision_of(deaths, metrics), precision, extinction_precision, fadeout_precision):
+                    break
+                n = min(batch_size, max_repeats - repeats)
+                more_deaths, more_metrics = run_batch(pool, n, [None] * n)
+                deaths += more_deaths
+                metrics += more_metrics
+                repeats += n
+
+    results = {
+        "deaths": np.array(deaths),
+        "metrics": np.array(metrics, dtype=EVENT_DTYPE)
+    }
+    returned = (results["deaths"], results["metrics"]) if output == "both" else (results[output],)
+
+    if return_info:
+        info = precision_of(deaths, metrics)
+        info["precision_target"] = precision
+        info["extinction_precision_target"] = extinction_precision
+        info["fadeout_precision_target"] = fadeout_precision
+        info["converged"] = _precision_met(info, precision, extinction_precision, fadeout_precision)
+        returned += (info,)
+
+    return returned if len(returned) > 1 else returned[0]
+
+def precision_info(final_deaths, extinct=None, confidence=0.95, faded=None):
+    """
+    Achieved precision of a replicate batch.
+
+    The half-width of final cumulative deaths uses the normal approximation;
+    the extinction and fade-out probabilities use the Wilson score interval,
+    which stays sensible when no (or every) replicate went extinct.
+
+    Args:
+        final_deaths: final cumulative deaths per replicate.
+        extinct: optional boolean extinction flag (no E, I or L birds) per replicate.
+        faded: optional boolean fade-out flag (no E or I birds at the end) per replicate.
+
+    Returns:
+        dict: repeats, mean_final_deaths, ci_halfwidth and, for the flags
+        given, extinction_/fadeout_probability and extinction_/fadeout_ci_halfwidth.
+    """
+    final = np.asarray(final_deaths)
+    n = len(final)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+
+    info = {
+        "repeats": n,
+        "confidence": confidence,
+        "mean_final_deaths": float(np.mean(final)),
+        "ci_halfwidth": float(z * np.std(final, ddof=1) / np.sqrt(n)) if n > 1 else float("inf")
+    }
+    for name, flags in (("extinction", extinct), ("fadeout", faded)):
+        if flags is not None:
+            p = float(np.mean(flags))
+            info[f"{name}_probability"] = p
+            info[f"{name}_ci_halfwidth"] = float(
+                z / (1 + z**2 / n) * np.sqrt(p * (1 - p) / n + z**2 / (4 * n**2))
+            )
+    return info
+
+def _precision_met(info, precision, extinction_precision, fadeout_precision=None):
+    met = precision is None or info["ci_halfwidth"] <= precision
+    if extinction_precision is not None:
+        met = met and info["extinction_ci_halfwidth"] <= extinction_precision
+    if fadeout_precision is not None:
+        met = met and info["fadeout_ci_halfwidth"] <= fadeout_precision
+    return met
+
+def run_branches(
+    variants,
+    initial_infectious=7,
+    initial_latent=30,
+    beta_within=0.1,
+    beta_cross=0.02,
+    mortality_rate=0.15,
+    reactivation_daily_p=1/3650,
+    repeats=500,
+    days=1095,
+    n_cores=10,
+    seed=None
+):
+    """
+    Evaluates many intervention schedules against one baseline, sharing the
+    pre-intervention days of every replicate (see branch_run).
+
+    Args:
+        variants: dict of name -> schedule, e.g.
+            {f"isolate_day{d}": [(d, {"beta_within": 0.2})] for d in (30, 60, 90)}
+
+    Returns:
+        dict: name -> numpy.ndarray of shape (repeats, days) daily deaths,
+        including the unmodified "baseline".
+    """
+    variants = {name: normalize_schedule(schedule, days) for name, schedule in variants.items()}
+    params = (initial_infectious, initial_latent, beta_within, beta_cross,
+              mortality_rate, reactivation_daily_p, days)
+    seeds = spawn_seeds(seed, repeats)
+    with Pool(processes=n_cores) as pool:
+        outputs = pool.starmap(branch_run, [(params, variants, s) for s in seeds])
+    return {name: np.array([out[name] for out in outputs]) for name in outputs[0]}
+
+# ---------------------------------------
+# Deterministic mean-field engine
+# ---------------------------------------
+
+def mean_field(
+    initial_infectious=7,
+    initial_latent=30,
+    beta_within=0.1,
+    beta_cross=0.02,
+    mortality_rate=0.15,
+    reactivation_daily_p=1/3650,
+    days=1095
+):
+    """
+    Deterministic mean-field counterpart of single_run, vectorised over
+    parameter sets.
+
+    Runs the same advance_day transitions as the stochastic engines with
+    every binomial draw replaced by its expectation, so a whole grid
+    advances as one array computation. Parameters
+    may be scalars or equal-length arrays.
+
+    Returns:
+        numpy.ndarray: shape (n_sets, days) expected daily deaths.
+    """
+    (initial_infectious, initial_latent, beta_within, beta_cross,
+     mortality_rate, reactivation_daily_p) = [
+        np.atleast_1d(np.asarray(x, dtype=float)) for x in np.broadcast_arrays(
+            initial_infectious, initial_latent, beta_within, beta_cross,
+            mortality_rate, reactivation_daily_p
+        )
+    ]
+    S, I, L, E_timers, I_timers = initial_compartments(initial_infectious, np.floor(initial_latent), dtype=float)
+    rates = {
+        "beta_within": beta_within,
+        "beta_cross": beta_cross,
+        "mortality_rate": mortality_rate,
+        "reactivation_daily_p": reactivation_daily_p
+    }
+
+    daily_deaths = np.zeros((len(beta_within), days))
+    for day in range(days):
+        _, died, _ = advance_day(S, I, L, E_timers, I_timers, day, rates, _expected)
+        daily_deaths[:, day] = died.sum(axis=1)
+
+    return daily_deaths
+
+# ---------------------------------------
+# Parameter-batched engine
+# ---------------------------------------
+
+def batch_chunk(pairs, days, seed=None):
+    """
+    Advances many (parameter set, replicate) pairs together for `days` days.
+
+    The advance_day transitions of step_day over a leading pair axis: each
+    aviary is still updated in turn, but its binomial draws are taken for
+    every pair at once from one generator per chunk. Pairs are independent, so they may mix parameter sets.
+
+    Args:
+        pairs: dict of equal-length arrays with keys initial_infectious,
+            initial_latent, beta_within, beta_cross, mortality_rate and
+            reactivation_daily_p (one entry per pair).
+
     Returns:
-        numpy.ndarray: shape (repeats, days) cumulative daily deaths.
+        (numpy.ndarray, numpy.ndarray): int16 daily deaths of shape
+        (pairs, days) and per-pair metrics with EVENT_DTYPE.
+    """
+    initial_infectious = np.asarray(pairs["initial_infectious"], dtype=np.int64)
+    rates = {name: np.asarray(pairs[name], dtype=float) for name in SCHEDULABLE}
+    rng = np.random.default_rng(seed)
+    n_pairs = len(initial_infectious)
+
+    S, I, L, E_timers, I_timers = initial_compartments(initial_infectious, pairs["initial_latent"])
+
+    metrics = np.zeros(n_pairs, dtype=EVENT_DTYPE)
+    metrics["extinction_day"] = -1
+    metrics["peak_infectious"] = I.sum(axis=1)
+    metrics["total_infections"] = initial_infectious
+    ever_infected = I > 0
+    last_active_day = np.full(n_pairs, -1)
+
+    daily_deaths = np.zeros((n_pairs, days), dtype=np.int16)
+    for day in range(days):
+        exposed, died, reactivated = advance_day(
+            S, I, L, E_timers, I_timers, day, rates, lambda n, p: _binomial(rng, n, p)
+        )
+        daily_deaths[:, day] = died.sum(axis=1)
+        metrics["total_infections"] += exposed.sum(axis=1)
+        metrics["reactivations"] += reactivated.sum(axis=1)
+
+        infectious = I.sum(axis=1)
+        peaked = infectious > metrics["peak_infectious"]
+        metrics["peak_infectious"][peaked] = infectious[peaked]
+        metrics["peak_day"][peaked] = day
+        E = E_timers.sum(axis=2)
+        ever_infected |= (E > 0) | (I > 0)
+        active = E.any(axis=1) | I.any(axis=1)
+        last_active_day[active] = day
+        extinct = ~active & ~L.any(axis=1)
+        metrics["extinction_day"][extinct & (metrics["extinction_day"] < 0)] = day
+
+    metrics["fadeout_day"] = np.where(last_active_day < days - 1, last_active_day + 1, -1)
+    metrics["aviaries_infected"] = ever_infected.sum(axis=1)
+    metrics["total_deaths"] = daily_deaths.sum(axis=1)
+    return daily_deaths, metrics
+
+def _batch_chunk_task(job):
+    # Pool worker for iter_batched
+    days, pairs, seed = job
+    return batch_chunk(pairs, days, seed)
+
+def batch_chunk_size(days, memory_mb=256):
+    """
+    Number of (parameter set, replicate) pairs whose engine state and daily
+    deaths fit in `memory_mb` per worker.
+    """
+    per_pair = (
+        8 * len(COMPARTMENT_SIZES) * (5 + INCUBATION_DAYS + INFECTIOUS_DAYS)  # compartments and timers
+        + 2 * days                                                            # int16 daily deaths
+        + 8 * 16                                                              # per-pair rates and metrics
+    )
+    return max(1, int(memory_mb * 2**20 // per_pair))
+
+def iter_batched(param_sets, seed=None, n_cores=10, memory_mb=256):
     """
+    Simulates many parameter sets as one computation over broadcast state
+    arrays, yielding each set as soon as all of its replicates are done.
+
+    The replicates of every set are laid out back to back and cut into chunks
+    of at most BATCH_CHUNK_PAIRS (and batch_chunk_size) pairs, so small-repeat
+    sets share chunks instead of paying per-call overhead. Chunks run across a
+    process pool; parameter sets with different `days` are chunked
+    separately. The chunk layout, and so the results for a seed, depends only
+    on param_sets and memory_mb, never on n_cores.
+
+    Args:
+        param_sets: sequence of dicts with the run_simulation parameters
+            initial_infectious, initial_latent, beta_within, beta_cross,
+            mortality_rate, reactivation_daily_p, repeats and days.
+
+    Yields:
+        (int, numpy.ndarray, numpy.ndarray): position in param_sets, daily
+        deaths of shape (repeats, days) and metrics with EVENT_DTYPE.
+    """
+    by_days = {}
+    for k, p in enumerate(param_sets):
+        by_days.setdefault(int(p["days"]), []).append(k)
+
+    tasks = []
+    for days, members in by_days.items():
+        owners = np.repeat(members, [int(param_sets[k]["repeats"]) for k in members])
+        if not len(owners):
+            continue
+        columns = {
+            name: np.repeat([param_sets[k][name] for k in members],
+                            [int(param_sets[k]["repeats"]) for k in members])
+            for name in ("initial_infectious", "initial_latent") + SCHEDULABLE
+        }
+        size = min(batch_chunk_size(days, memory_mb), BATCH_CHUNK_PAIRS)
+        for start in range(0, len(owners), size):
+            chunk = slice(start, start + size)
+            tasks.append((days, owners[chunk], {name: values[chunk] for name, values in columns.items()}))
+
+    remaining = {k: int(p["repeats"]) for k, p in enumerate(param_sets)}
+    pieces = {k: [] for k in remaining}
+    for k in [k for k, n in remaining.items() if n == 0]:
+        days = int(param_sets[k]["days"])
+        yield k, np.zeros((0, days), dtype=np.int64), np.zeros(0, dtype=EVENT_DTYPE)
+
+    seeds = spawn_seeds(seed, len(tasks))
     with Pool(processes=n_cores) as pool:
-        param_list = [(initial_infectious, initial_latent, beta_within, beta_cross,
-                       mortality_rate, reactivation_daily_p, days)] * repeats
-        results = pool.map(single_run, param_list)
-    return np.array(results)
+        outputs = pool.imap(_batch_chunk_task, [(days, pairs, s) for (days, _, pairs), s in zip(tasks, seeds)])
+        for (_, owners, _), (deaths, metrics) in zip(tasks, outputs):
+            for k in np.unique(owners):
+                rows = owners == k
+                pieces[k].append((deaths[rows], metrics[rows]))
+                remaining[k] -= int(rows.sum())
+                if remaining[k] == 0:
+                    parts = pieces.pop(k)
+                    yield (
+                        int(k),
+                        np.concatenate([d for d, _ in parts]).astype(np.int64),
+                        np.concatenate([m for _, m in parts])
+                    )
+
+def run_batched(param_sets, seed=None, n_cores=10, memory_mb=256):
+    """
+    Parameter-batched counterpart of run_simulation (see iter_batched).
+
+    Returns:
+        list: (daily deaths, metrics) per entry of param_sets, in order.
+    """
+    results = [None] * len(param_sets)
+    for k, deaths, metrics in iter_batched(param_sets, seed, n_cores, memory_mb):
+        results[k] = (deaths, metrics)
+    return results
+
+def open_trajectory_file(path, repeats, days, every=1, aviaries=None, max_count=255):
+    """
+    Pre-allocates the on-disk trajectory array and its JSON sidecar.
+
+    Counts are stored as uint8 whenever no compartment can exceed 255 birds,
+    which keeps a 3000 x 1095 x 8 x 5 recording around 130 MB on disk and
+    never materialises it in memory.
+
+    Returns:
+        dict: recording spec passed to single_run workers.
+    """
+    aviaries = list(range(len(COMPARTMENT_SIZES))) if aviaries is None else [int(a) for a in aviaries]
+    dtype = "uint8" if max_count <= np.iinfo(np.uint8).max else "uint16"
+    recorded_days = list(range(0, days, every))
+
+    out = np.lib.format.open_memmap(
+        path, mode="w+", dtype=dtype,
+        shape=(repeats, len(recorded_days), len(aviaries), len(COMPARTMENTS))
+    )
+    del out
+
+    with open(_trajectory_meta_path(path), "w") as f:
+        json.dump({
+            "compartments": list(COMPARTMENTS),
+            "aviaries": aviaries,
+            "every": every,
+            "days": recorded_days
+        }, f)
+
+    return {"path": str(path), "every": every, "aviaries": aviaries, "dtype": dtype}
+
+def load_trajectories(path):
+    """
+    Opens a recorded trajectory read-only.
+
+    Returns:
+        (numpy.memmap, dict): array of shape (repeats, recorded_days, aviaries,
+        compartments) and its metadata (compartment order, aviaries, days).
+    """
+    with open(_trajectory_meta_path(path)) as f:
+        meta = json.load(f)
+    return np.load(path, mmap_mode="r"), meta
+
+def _trajectory_meta_path(path):
+    return f"{os.path.splitext(str(path))[0]}_meta.json"
+
+def spawn_seeds(seed, n):
+    """
+    Returns n independent child seeds of `seed` (or n Nones if seed is None).
+    """
+    if seed is None:
+        return [None] * n
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return seed.spawn(n)
@@ -7,6 +7,7 @@ Author: Julen Gamboa
 Date: 06/2025
 """
 
+import argparse
 import pandas as pd
 import itertools
 from seildr_sim.path_resolver import resolve_scenarios_path
@@ -31,28 +32,38 @@ cores = 10
 # Generate full design grid
 # ---------------------------------------------------
 
-rows = []
+def build_grid():
+    rows = []
 
-for scenario, mortality, infectious, latent in itertools.product(
-    scenarios, mortality_values, initial_infectious_values, initial_latent_values
-):
-    row = {
-        "scenario": scenario,
-        "initial_infectious": infectious,
-        "initial_latent": latent,
-        "mortality": mortality,
-        "reactivation": reactivation,
-        "repeats": repeats,
-        "days": days,
-        "cores": cores
-    }
-    rows.append(row)
+    for scenario, mortality, infectious, latent in itertools.product(
+        scenarios, mortality_values, initial_infectious_values, initial_latent_values
+    ):
+        row = {
+            "scenario": scenario,
+            "initial_infectious": infectious,
+            "initial_latent": latent,
+            "mortality": mortality,
+            "reactivation": reactivation,
+            "repeats": repeats,
+            "days": days,
+            "cores": cores
+        }
+        rows.append(row)
 
-df = pd.DataFrame(rows)
+    return pd.DataFrame(rows)
 
-# Use the path resolver to always write into src/seildr_sim/scenarios/
-scenarios_path = resolve_scenarios_path()
-df.to_csv(scenarios_path, index=False)
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Regenerate the factorial scenarios.csv grid")
+    parser.add_argument("--output", type=str, help="Output CSV (defaults to the packaged scenarios.csv)")
+    args = parser.parse_args(argv)
 
-print(f"Generated scenarios.csv with {len(df)} rows at {scenarios_path}")
+    df = build_grid()
 
+    # Use the path resolver to always write into src/seildr_sim/scenarios/
+    scenarios_path = args.output or resolve_scenarios_path()
+    df.to_csv(scenarios_path, index=False)
+
+    print(f"Generated scenarios.csv with {len(df)} rows at {scenarios_path}")
+
+if __name__ == "__main__":
+    main()
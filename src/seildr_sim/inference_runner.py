@@ -8,30 +8,50 @@ Author: Julen Gamboa
 Date: 06/2025
 """
 
-import pymc as pm
-import arviz as az
-import pandas as pd
-from seildr_sim import bayesian_model
-import matplotlib.pyplot as plt
+import argparse
 import os
 
-# Output directory
-os.makedirs("results/summaries", exist_ok=True)
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Run PyMC inference on exported simulation output")
+    parser.add_argument("--data", type=str, help="Observed cumulative deaths CSV (defaults to results/simulation_results.csv)")
+    parser.add_argument("--draws", type=int, default=4000)
+    parser.add_argument("--tune", type=int, default=4000)
+    parser.add_argument("--cores", type=int, default=10)
+    parser.add_argument("--trace", type=str, default="results/bayesian_trace.nc", help="Where to save the posterior trace (NetCDF)")
+    parser.add_argument("--no-plot", action="store_true", help="Skip the interactive trace plot")
+    args = parser.parse_args(argv)
 
-print("Running Bayesian inference...")
+    # PyMC and ArviZ are optional and slow to import; load them only once
+    # the arguments are known to be valid (so --help works without them)
+    import pymc as pm
+    import arviz as az
+    from seildr_sim import bayesian_model
 
-with bayesian_model.model:
-    trace = pm.sample(4000, tune=4000, target_accept=0.95, cores=10)
+    # Output directory
+    os.makedirs("results/summaries", exist_ok=True)
 
-az.plot_trace(trace)
-plt.show()
+    print("Running Bayesian inference...")
 
-summary = az.summary(trace)
-print(summary)
+    with bayesian_model.build_model(args.data):
+        trace = pm.sample(args.draws, tune=args.tune, target_accept=0.95, cores=args.cores)
 
-# Save results always inside /results/summaries/
-output_file = "results/summaries/bayesian_inference_summary.csv"
-summary.to_csv(output_file)
+    # Keep the full trace so posterior draws can be pushed through core_model
+    trace.to_netcdf(args.trace)
+    print(f"Trace saved to {args.trace}")
 
-print(f"\nInference complete. Summary saved to {output_file}")
+    if not args.no_plot:
+        import matplotlib.pyplot as plt
+        az.plot_trace(trace)
+        plt.show()
 
+    summary = az.summary(trace)
+    print(summary)
+
+    # Save results always inside /results/summaries/
+    output_file = "results/summaries/bayesian_inference_summary.csv"
+    summary.to_csv(output_file)
+
+    print(f"\nInference complete. Summary saved to {output_file}")
+
+if __name__ == "__main__":
+    main()
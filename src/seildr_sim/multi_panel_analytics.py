@@ -5,111 +5,207 @@ multi_panel_analytics.py — Clean version: heatmaps, thresholds, stability plot
 
 Author: Julen Gamboa
 Date: 06/2025
+
+Figures are described as jobs (pivot table + labels + output file) built in a
+single grouped pass over the summary, rendered across a process pool on the
+non-interactive Agg backend, and skipped when the hash of their input slice
+matches the one recorded at the last render.
 """
 
+import argparse
+import hashlib
+import json
+import os
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use("Agg")
 import seaborn as sns
 import matplotlib.pyplot as plt
-import os
-from seildr_sim.path_resolver import resolve_summary_path
-
-# -----------------------------------------------------
-# Load aggregated data
-# -----------------------------------------------------
+from multiprocessing import Pool
 
-summary_file = resolve_summary_path()
-df = pd.read_csv(summary_file)
+SUMMARY_DIR = "results/summaries"
+MANIFEST = os.path.join(SUMMARY_DIR, ".figure_manifest.json")
 
 # -----------------------------------------------------
-# Master output directories
+# Figure jobs
 # -----------------------------------------------------
 
-os.makedirs("results/summaries/heatmaps/latent", exist_ok=True)
-os.makedirs("results/summaries/heatmaps/infectious", exist_ok=True)
-os.makedirs("results/summaries/thresholds", exist_ok=True)
-os.makedirs("results/summaries/stability", exist_ok=True)
-
-scenarios = sorted(df['scenario'].unique())
+def _job(pivot, outfile, title, ylabel, fmt, cmap, cbar_label):
+    return {
+        "pivot": pivot,
+        "outfile": outfile,
+        "title": title,
+        "ylabel": ylabel,
+        "xlabel": "Mortality",
+        "fmt": fmt,
+        "cmap": cmap,
+        "cbar_label": cbar_label
+    }
+
+def job_hash(job):
+    """
+    Fingerprint of everything that affects a figure: pivot values, row and
+    column labels, and rendering options.
+    """
+    pivot = job["pivot"]
+    digest = hashlib.sha1()
+    digest.update(pd.util.hash_pandas_object(pivot, index=True).values.tobytes())
+    digest.update(json.dumps([list(map(str, pivot.columns)), pivot.index.name, pivot.columns.name]).encode())
+    digest.update(json.dumps({k: v for k, v in job.items() if k != "pivot"}, sort_keys=True).encode())
+    return digest.hexdigest()
 
 # -----------------------------------------------------
 # 1. HEATMAPS — LATENT & INFECTIOUS
 # -----------------------------------------------------
 
-for scenario in scenarios:
-    subset = df[df['scenario'] == scenario]
-
-    infectious_levels = sorted(subset['initial_infectious'].unique())
-    for infectious in infectious_levels:
-        subsub = subset[subset['initial_infectious'] == infectious]
+def heatmap_jobs(scenario, subset, summary_dir=SUMMARY_DIR):
+    jobs = []
+    for infectious, subsub in subset.groupby("initial_infectious"):
         pivot = subsub.pivot_table(index="initial_latent", columns="mortality", values="mean_deaths")
+        jobs.append(_job(
+            pivot, f"{summary_dir}/heatmaps/latent/{scenario}_i{infectious}_heatmap_latent.png",
+            f"{scenario} | Infectious={infectious} (Mortality vs Latent)", "Initial Latent",
+            ".1f", "viridis", "Mean deaths"
+        ))
 
-        plt.figure(figsize=(10, 6))
-        sns.heatmap(pivot, annot=True, fmt=".1f", cmap="viridis", cbar_kws={"label": "Mean deaths"})
-        plt.title(f"{scenario} | Infectious={infectious} (Mortality vs Latent)")
-        plt.ylabel("Initial Latent")
-        plt.xlabel("Mortality")
-        plt.tight_layout()
-        outfile = f"results/summaries/heatmaps/latent/{scenario}_i{infectious}_heatmap_latent.png"
-        plt.savefig(outfile, dpi=300)
-        plt.close()
-
-    latent_levels = sorted(subset['initial_latent'].unique())
-    for latent in latent_levels:
-        subsub = subset[subset['initial_latent'] == latent]
+    for latent, subsub in subset.groupby("initial_latent"):
         pivot = subsub.pivot_table(index="initial_infectious", columns="mortality", values="mean_deaths")
-
-        plt.figure(figsize=(10, 6))
-        sns.heatmap(pivot, annot=True, fmt=".1f", cmap="viridis", cbar_kws={"label": "Mean deaths"})
-        plt.title(f"{scenario} | Latent={latent} (Mortality vs Infectious)")
-        plt.ylabel("Initial Infectious")
-        plt.xlabel("Mortality")
-        plt.tight_layout()
-        outfile = f"results/summaries/heatmaps/infectious/{scenario}_l{latent}_heatmap_infectious.png"
-        plt.savefig(outfile, dpi=300)
-        plt.close()
+        jobs.append(_job(
+            pivot, f"{summary_dir}/heatmaps/infectious/{scenario}_l{latent}_heatmap_infectious.png",
+            f"{scenario} | Latent={latent} (Mortality vs Infectious)", "Initial Infectious",
+            ".1f", "viridis", "Mean deaths"
+        ))
+    return jobs
 
 # -----------------------------------------------------
 # 2. THRESHOLD MAPS (Extinction vs outbreak)
 # -----------------------------------------------------
 
-threshold = 20
-for scenario in scenarios:
-    subset = df[df['scenario'] == scenario].copy()
-    subset["extinct"] = subset["mean_deaths"] < threshold
-
+def threshold_jobs(scenario, subset, threshold=20, summary_dir=SUMMARY_DIR):
+    subset = subset.assign(extinct=subset["mean_deaths"] < threshold)
     pivot = subset.pivot_table(index="initial_latent", columns="mortality", values="extinct")
+    jobs = [_job(
+        pivot, f"{summary_dir}/thresholds/{scenario}_extinction_map.png",
+        f"{scenario} — Extinction zones (threshold={threshold:g})", "Initial Latent",
+        ".0f", "coolwarm", "Extinction (1=stable, 0=outbreak)"
+    )]
+
+    # Simulated fade-out probability (engine event metrics): no exposed or
+    # infectious birds at the end of the run. Full extinction also needs every
+    # latent carrier gone, which reactivation at ~1/3650 per day practically
+    # never allows within a run, so fade-out is mapped instead.
+    if "fadeout_prob" in subset and subset["fadeout_prob"].notna().all():
+        pivot = subset.pivot_table(index="initial_latent", columns="mortality", values="fadeout_prob")
+        jobs.append(_job(
+            pivot, f"{summary_dir}/thresholds/{scenario}_fadeout_map.png",
+            f"{scenario} — Fade-out probability (no exposed or infectious birds at end)", "Initial Latent",
+            ".2f", "coolwarm", "P(fade-out) by end of run"
+        ))
+    return jobs
 
+# -----------------------------------------------------
+# 3. STABILITY MAPS (variance zones)
+# -----------------------------------------------------
+
+def stability_jobs(scenario, subset, summary_dir=SUMMARY_DIR):
+    jobs = []
+    for infectious, subsub in subset.groupby("initial_infectious"):
+        pivot = subsub.pivot_table(index="initial_latent", columns="mortality", values="std_deaths")
+        jobs.append(_job(
+            pivot, f"{summary_dir}/stability/{scenario}_i{infectious}_stability_map.png",
+            f"{scenario} | Infectious={infectious} — Stability map", "Initial Latent",
+            ".1f", "mako_r", "Std deviation of deaths"
+        ))
+    return jobs
+
+def build_jobs(df, threshold=20, summary_dir=SUMMARY_DIR):
+    jobs = []
+    for scenario, subset in df.groupby("scenario"):
+        jobs += heatmap_jobs(scenario, subset, summary_dir)
+        jobs += threshold_jobs(scenario, subset, threshold, summary_dir)
+        jobs += stability_jobs(scenario, subset, summary_dir)
+    return jobs
+
+# -----------------------------------------------------
+# Rendering
+# -----------------------------------------------------
+
+def render_job(job):
     plt.figure(figsize=(10, 6))
-    sns.heatmap(pivot, annot=True, fmt=".0f", cmap="coolwarm", cbar_kws={"label": "Extinction (1=stable, 0=outbreak)"})
-    plt.title(f"{scenario} — Extinction zones (threshold={threshold})")
-    plt.ylabel("Initial Latent")
-    plt.xlabel("Mortality")
+    sns.heatmap(job["pivot"], annot=True, fmt=job["fmt"], cmap=job["cmap"], cbar_kws={"label": job["cbar_label"]})
+    plt.title(job["title"])
+    plt.ylabel(job["ylabel"])
+    plt.xlabel(job["xlabel"])
     plt.tight_layout()
-    outfile = f"results/summaries/thresholds/{scenario}_extinction_map.png"
-    plt.savefig(outfile, dpi=300)
+    plt.savefig(job["outfile"], dpi=300)
     plt.close()
+    return job["outfile"]
+
+def load_manifest(path=MANIFEST):
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+def save_manifest(manifest, path=MANIFEST):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+def render_all(jobs, n_jobs=None, force=False, manifest_path=MANIFEST):
+    """
+    Renders the jobs whose input hash changed (or whose file is missing).
+
+    Returns:
+        (int, int): figures rendered and figures skipped.
+    """
+    manifest = load_manifest(manifest_path)
+    hashes = {job["outfile"]: job_hash(job) for job in jobs}
+    todo = [
+        job for job in jobs
+        if force or manifest.get(job["outfile"]) != hashes[job["outfile"]] or not os.path.exists(job["outfile"])
+    ]
+
+    for outdir in {os.path.dirname(job["outfile"]) for job in todo}:
+        os.makedirs(outdir, exist_ok=True)
+
+    if todo:
+        with Pool(processes=n_jobs or os.cpu_count()) as pool:
+            for outfile in pool.imap_unordered(render_job, todo):
+                manifest[outfile] = hashes[outfile]
+        save_manifest(manifest, manifest_path)
+
+    return len(todo), len(jobs) - len(todo)
 
 # -----------------------------------------------------
-# 3. STABILITY MAPS (variance zones)
+# Entry point
 # -----------------------------------------------------
 
-for scenario in scenarios:
-    subset = df[df['scenario'] == scenario]
-    infectious_levels = sorted(subset['initial_infectious'].unique())
-
-    for infectious in infectious_levels:
-        subsub = subset[subset['initial_infectious'] == infectious]
-        pivot = subsub.pivot_table(index="initial_latent", columns="mortality", values="std_deaths")
-
-        plt.figure(figsize=(10, 6))
-        sns.heatmap(pivot, annot=True, fmt=".1f", cmap="mako_r", cbar_kws={"label": "Std deviation of deaths"})
-        plt.title(f"{scenario} | Infectious={infectious} — Stability map")
-        plt.ylabel("Initial Latent")
-        plt.xlabel("Mortality")
-        plt.tight_layout()
-        outfile = f"results/summaries/stability/{scenario}_i{infectious}_stability_map.png"
-        plt.savefig(outfile, dpi=300)
-        plt.close()
-
-print("\nMulti-panel analytics complete.")
\ No newline at end of file
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Heatmaps, threshold and stability maps from the aggregate summary")
+    parser.add_argument("--results", type=str, default="results",
+                        help="Results directory used by `aggregate`; figures go to <results>/summaries")
+    parser.add_argument("--summary", type=str, help="Aggregate summary CSV (defaults to <results>/summaries/aggregate_summary.csv)")
+    parser.add_argument("--threshold", type=float, default=20,
+                        help="Mean deaths below which a region counts as extinct in the threshold maps")
+    parser.add_argument("--jobs", type=int, help="Rendering processes (defaults to all cores)")
+    parser.add_argument("--force", action="store_true", help="Redraw every figure even if its inputs are unchanged")
+    args = parser.parse_args(argv)
+
+    # Load aggregated data from where aggregate_results.py writes it
+    summary_dir = os.path.join(args.results, "summaries")
+    summary_file = args.summary or os.path.join(summary_dir, "aggregate_summary.csv")
+    if not os.path.exists(summary_file):
+        raise FileNotFoundError(f"Cannot find summary at: {summary_file} (run `seildr aggregate` first)")
+    df = pd.read_csv(summary_file)
+    os.makedirs(summary_dir, exist_ok=True)
+
+    jobs = build_jobs(df, args.threshold, summary_dir)
+    rendered, skipped = render_all(jobs, args.jobs, args.force, os.path.join(summary_dir, ".figure_manifest.json"))
+
+    print(f"\nMulti-panel analytics complete: {rendered} figures rendered, {skipped} unchanged.")
+
+if __name__ == "__main__":
+    main()
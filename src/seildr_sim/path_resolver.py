@@ -19,3 +19,6 @@ def resolve_logs_dir():
     path = PROJECT_ROOT / "logs"
     path.mkdir(parents=True, exist_ok=True)
     return path
+
+def resolve_results_path(filename):
+    return resolve_results_dir() / filename
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+posterior_predictive.py — Posterior predictive simulation through core_model
+
+Description:
+---------------------------------------
+Pushes posterior uncertainty from the PyMC trace written by
+inference_runner.py through the stochastic SEILDR engine:
+
+1. Posterior samples (all chains) are shuffled once with a fixed seed, so
+   draw i always refers to the same posterior sample.
+2. Each draw is mapped onto core_model parameters and simulated with its own
+   seed (seed, draw, replicate) in large parallel batches.
+3. Cumulative death trajectories are cached in fixed-size draw chunks. Asking
+   for more draws later (e.g. 500 -> 5000) only simulates the new chunks.
+4. Predictive bands (mean and quantiles per day) are computed block-by-block
+   over memory-mapped chunks and streamed to CSV.
+
+Parameter mapping:
+---------------------------------------
+- beta_within, beta_cross, mortality_rate -> same names in core_model
+- reactivation_rate -> reactivation_daily_p
+- latent_fraction -> initial_latent, spread evenly over the aviaries
+  (core_model seeds `initial_latent` carriers into every aviary)
+- initial_infectious is not inferred; set it with --initial-infectious
+
+The transmission rates are copied as-is, but the two models do not use them
+the same way:
+- bayesian_model is a single well-mixed pool of 129 birds (its own aviary
+  list), with force of infection (beta_within + beta_cross) * I_total / 129.
+- core_model has 127 birds in COMPARTMENT_SIZES and a per-aviary force of
+  infection beta_within * I_i / size_i + beta_cross * I_others / 127.
+The two only coincide when prevalence is equal in every aviary. Early on,
+while infection is concentrated in one aviary, core_model's within-aviary
+pressure is several times the pooled one, so the predictive bands are not
+a posterior predictive of the fitted model itself. There is no exact
+conversion between the two; treat the bands as "posterior-informed"
+until bayesian_model is rebuilt on the aviary structure.
+
+Usage example:
+---------------------------------------
+    python -m seildr_sim.posterior_predictive --trace results/bayesian_trace.nc --draws 500
+    python -m seildr_sim.posterior_predictive --trace results/bayesian_trace.nc --draws 5000
+
+Output:
+---------------------------------------
+- results/summaries/posterior_predictive_bands.csv
+- results/summaries/posterior_predictive_draws.csv
+- results/cache/posterior_predictive/<trace key>/draws_*.npy
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import numpy as np
+import pandas as pd
+from multiprocessing import Pool
+from seildr_sim.core_model import single_run, COMPARTMENT_SIZES
+
+QUANTILES = [0.025, 0.25, 0.5, 0.75, 0.975]
+
+# Fallbacks for engine parameters the trace does not contain
+DEFAULTS = {
+    "beta_within": 0.1,
+    "beta_cross": 0.02,
+    "mortality_rate": 0.15,
+    "reactivation_daily_p": 1/3650
+}
+
+# ---------------------------------------
+# Posterior draws
+# ---------------------------------------
+
+def posterior_samples(trace_path):
+    """
+    Flattens every chain of a saved trace into one row per posterior sample.
+    """
+    import arviz as az
+
+    posterior = az.from_netcdf(trace_path).posterior
+    names = [name for name in posterior.data_vars if posterior[name].ndim == 2]
+    return pd.DataFrame({name: posterior[name].values.reshape(-1) for name in names})
+
+def select_draws(samples, n_draws, seed=0):
+    """
+    Picks n_draws posterior samples in a seed-stable order, so a larger
+    request always starts with the draws of a smaller one. Samples are reused
+    (in the same order) if more draws than samples are requested.
+    """
+    order = np.random.default_rng(seed).permutation(len(samples))
+    idx = order[np.arange(n_draws) % len(order)]
+    return samples.iloc[idx].reset_index(drop=True)
+
+def draws_to_params(draws, initial_infectious=1):
+    """
+    Maps posterior variables onto run_simulation parameters.
+
+    Returns:
+        pandas.DataFrame: one row per draw with core_model parameter columns.
+    """
+    n_aviaries = len(COMPARTMENT_SIZES)
+    params = pd.DataFrame(index=draws.index)
+    params["initial_infectious"] = int(initial_infectious)
+    if "latent_fraction" in draws:
+        params["initial_latent"] = np.round(draws["latent_fraction"] * COMPARTMENT_SIZES.sum() / n_aviaries).astype(int)
+    else:
+        params["initial_latent"] = 0
+    for name in ("beta_within", "beta_cross", "mortality_rate"):
+        params[name] = draws[name] if name in draws else DEFAULTS[name]
+    params["reactivation_daily_p"] = draws["reactivation_rate"] if "reactivation_rate" in draws else DEFAULTS["reactivation_daily_p"]
+    return params
+
+# ---------------------------------------
+# Chunked simulation cache
+# ---------------------------------------
+
+def cache_key(trace_path, **settings):
+    """
+    Identifies a cache by trace contents plus every setting that changes draws.
+    """
+    digest = hashlib.sha1()
+    with open(trace_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    digest.update(json.dumps(settings, sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+def cached_chunks(cache_dir):
+    """
+    Returns sorted (start, stop, path) for every cached draw chunk.
+    """
+    chunks = []
+    if os.path.isdir(cache_dir):
+        for name in os.listdir(cache_dir):
+            match = re.fullmatch(r"draws_(\d+)_(\d+)\.npy", name)
+            if match:
+                chunks.append((int(match.group(1)), int(match.group(2)), os.path.join(cache_dir, name)))
+    return sorted(chunks)
+
+def _cumulative_deaths(params, seed):
+    return np.cumsum(single_run(params, seed)).astype(np.int16)
+
+def simulate_draws(params, cache_dir, days=1095, replicates=1, chunk_size=250, n_cores=10, seed=0):
+    """
+    Simulates every draw not yet covered by the cache.
+
+    Chunks hold int16 cumulative deaths of shape (draws, replicates, days)
+    and are written atomically, so an interrupted run resumes cleanly.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    n_draws = len(params)
+    covered = max((stop for _, stop, _ in cached_chunks(cache_dir)), default=0)
+    if covered >= n_draws:
+        print(f"All {n_draws} draws already cached in {cache_dir}")
+        return
+
+    entropy = np.random.SeedSequence(seed).entropy
+    columns = ["initial_infectious", "initial_latent", "beta_within", "beta_cross",
+               "mortality_rate", "reactivation_daily_p"]
+
+    with Pool(processes=n_cores) as pool:
+        for start in range(covered, n_draws, chunk_size):
+            stop = min(start + chunk_size, n_draws)
+            tasks = []
+            for d in range(start, stop):
+                row = params.iloc[d]
+                model_params = (int(row["initial_infectious"]), int(row["initial_latent"]),
+                                *(float(row[c]) for c in columns[2:]), days)
+                for r in range(replicates):
+                    tasks.append((model_params, np.random.SeedSequence(entropy, spawn_key=(d, r))))
+
+            trajectories = np.array(pool.starmap(_cumulative_deaths, tasks), dtype=np.int16)
+            trajectories = trajectories.reshape(stop - start, replicates, days)
+
+            path = os.path.join(cache_dir, f"draws_{start:06d}_{stop:06d}.npy")
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, trajectories)
+            os.replace(tmp, path)
+            print(f"Simulated draws {start}-{stop - 1} of {n_draws}")
+
+# ---------------------------------------
+# Predictive bands
+# ---------------------------------------
+
+def write_bands(cache_dir, n_draws, out_path, days_per_block=100):
+    """
+    Streams per-day mean and quantiles of cumulative deaths to CSV.
+
+    Only one block of days from every (memory-mapped) chunk is resident at a
+    time, so memory stays bounded for any number of draws.
+    """
+    chunks = [(start, min(stop, n_draws), np.load(path, mmap_mode="r"))
+              for start, stop, path in cached_chunks(cache_dir) if start < n_draws]
+    days = chunks[0][2].shape[-1]
+
+    with open(out_path, "w") as f:
+        header = ["Day", "mean"] + [f"q{q:g}" for q in QUANTILES]
+        f.write(",".join(header) + "\n")
+        for first in range(0, days, days_per_block):
+            last = min(first + days_per_block, days)
+            block = np.concatenate([
+                np.asarray(chunk[: stop - start, :, first:last]).reshape(-1, last - first)
+                for start, stop, chunk in chunks
+            ])
+            mean = block.mean(axis=0)
+            bands = np.quantile(block, QUANTILES, axis=0)
+            for j, day in enumerate(range(first, last)):
+                values = [f"{mean[j]:.4f}"] + [f"{v:.4f}" for v in bands[:, j]]
+                f.write(f"{day}," + ",".join(values) + "\n")
+
+# ---------------------------------------
+# CLI
+# ---------------------------------------
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Posterior predictive simulation of cumulative deaths")
+    parser.add_argument("--trace", type=str, default="results/bayesian_trace.nc", help="NetCDF trace from inference_runner")
+    parser.add_argument("--draws", type=int, default=500, help="Number of posterior draws to simulate")
+    parser.add_argument("--replicates", type=int, default=1, help="Stochastic replicates per draw")
+    parser.add_argument("--initial-infectious", type=int, default=1, help="Initial infectious birds (not inferred)")
+    parser.add_argument("--days", type=int, default=1095)
+    parser.add_argument("--chunk-size", type=int, default=250, help="Draws per parallel batch / cache file")
+    parser.add_argument("--cores", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache", type=str, default="results/cache/posterior_predictive")
+    parser.add_argument("--output", type=str, default="results/summaries/posterior_predictive_bands.csv")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.trace):
+        raise FileNotFoundError(f"Cannot find trace at: {args.trace} (run `seildr infer` first)")
+
+    draws = select_draws(posterior_samples(args.trace), args.draws, args.seed)
+    params = draws_to_params(draws, args.initial_infectious)
+
+    key = cache_key(args.trace, days=args.days, replicates=args.replicates, seed=args.seed,
+                    initial_infectious=args.initial_infectious)
+    cache_dir = os.path.join(args.cache, key)
+    simulate_draws(params, cache_dir, args.days, args.replicates, args.chunk_size, args.cores, args.seed)
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    write_bands(cache_dir, args.draws, args.output)
+    params.to_csv(os.path.join(os.path.dirname(args.output) or ".", "posterior_predictive_draws.csv"), index_label="draw")
+    print(f"Predictive bands for {args.draws} draws x {args.replicates} replicates saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+screening.py — Mean-field screening of scenario grids
+
+Description:
+---------------------------------------
+Uses the deterministic mean-field engine (core_model.mean_field) to triage a
+scenario grid before stochastic replicates are spent on it:
+
+- Rows whose mean-field final deaths fall below `low` are clearly extinct;
+  rows above `high` are clearly catastrophic. Both keep only a handful of
+  stochastic replicates (`screen_repeats`) instead of the full count.
+- Unless given explicitly, `low` and `high` are calibrated to the grid as
+  quantiles of its mean-field deaths (default 10% and 90%). Fixed absolute
+  cut-offs screen nothing on the packaged grid, whose mean-field deaths all
+  lie between ~3 and ~96 birds.
+- After a batch run, the mean-field prediction is compared with the
+  stochastic mean of every row, flagging where the two diverge (typically
+  near outbreak thresholds, where stochastic fade-out matters).
+
+Usage example:
+---------------------------------------
+    python -m seildr_sim.screening                     # screen scenarios.csv
+    python -m seildr_sim.screening --summary results/summaries/aggregate_summary.csv
+
+Output:
+---------------------------------------
+- results/summaries/mean_field_screen.csv
+- results/summaries/mean_field_divergence.csv (with --summary)
+"""
+
+import argparse
+import os
+import numpy as np
+import pandas as pd
+from seildr_sim.core_model import mean_field
+from seildr_sim.batch_scenario_runner import load_scenarios, row_to_params
+
+# Default grid quantiles of mean-field deaths used as screening cut-offs
+LOW_QUANTILE = 0.1
+HIGH_QUANTILE = 0.9
+
+def mean_field_deaths(df):
+    """
+    Mean-field final cumulative deaths for every scenarios.csv row
+    (NaN for unknown scenarios), evaluated in one vectorised call per
+    distinct simulation length.
+    """
+    params = [row_to_params(row) for _, row in df.iterrows()]
+    finals = np.full(len(df), np.nan)
+
+    known = [k for k, p in enumerate(params) if p is not None]
+    for days in {params[k]["days"] for k in known}:
+        rows = [k for k in known if params[k]["days"] == days]
+        finals[rows] = mean_field(
+            initial_infectious=[params[k]["initial_infectious"] for k in rows],
+            initial_latent=[params[k]["initial_latent"] for k in rows],
+            beta_within=[params[k]["beta_within"] for k in rows],
+            beta_cross=[params[k]["beta_cross"] for k in rows],
+            mortality_rate=[params[k]["mortality_rate"] for k in rows],
+            reactivation_daily_p=[params[k]["reactivation_daily_p"] for k in rows],
+            days=days
+        ).sum(axis=1)
+    return finals
+
+def screen_thresholds(finals, low=None, high=None, low_quantile=LOW_QUANTILE, high_quantile=HIGH_QUANTILE):
+    """
+    Screening cut-offs: explicit `low`/`high`, otherwise the given quantiles
+    of the grid's mean-field deaths.
+    """
+    low = np.nanquantile(finals, low_quantile) if low is None else low
+    high = np.nanquantile(finals, high_quantile) if high is None else high
+    return float(low), float(high)
+
+def screen_scenarios(df, low=None, high=None, screen_repeats=50,
+                     low_quantile=LOW_QUANTILE, high_quantile=HIGH_QUANTILE):
+    """
+    Labels each row "extinct", "catastrophic" or "run" from its mean-field
+    final deaths and caps the repeats of screened rows at screen_repeats.
+    Missing thresholds are calibrated to the grid (see screen_thresholds).
+
+    Returns:
+        pandas.DataFrame: copy of df with `mean_field_deaths` and `screen`.
+    """
+    screened = df.copy()
+    screened["mean_field_deaths"] = mean_field_deaths(df)
+    low, high = screen_thresholds(screened["mean_field_deaths"], low, high, low_quantile, high_quantile)
+    screened["screen"] = np.select(
+        [screened["mean_field_deaths"] < low, screened["mean_field_deaths"] > high],
+        ["extinct", "catastrophic"],
+        default="run"
+    )
+    skip = screened["screen"] != "run"
+    screened.loc[skip, "repeats"] = np.minimum(screened.loc[skip, "repeats"], screen_repeats)
+    return screened
+
+def divergence_report(summary, df, abs_tol=2.0, rel_tol=0.25):
+    """
+    Compares stochastic mean deaths from aggregate_summary.csv with the
+    mean-field prediction of the matching scenarios.csv row.
+
+    A row diverges when |stochastic - mean field| exceeds both abs_tol and
+    rel_tol x mean field.
+
+    Returns:
+        pandas.DataFrame: one row per matched scenario, largest gaps first.
+    """
+    keys = ["scenario", "mortality", "initial_infectious", "initial_latent"]
+    predicted = df[keys].copy()
+    predicted["mean_field_deaths"] = mean_field_deaths(df)
+
+    report = summary.merge(predicted.drop_duplicates(keys), on=keys, how="inner")
+    report["divergence"] = report["mean_deaths"] - report["mean_field_deaths"]
+    gap = report["divergence"].abs()
+    report["diverges"] = (gap > abs_tol) & (gap > rel_tol * report["mean_field_deaths"])
+    return report.sort_values("divergence", key=np.abs, ascending=False)
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Mean-field screening and mean-field vs stochastic comparison")
+    parser.add_argument("--scenarios", type=str, help="Scenario grid CSV (defaults to packaged scenarios.csv)")
+    parser.add_argument("--low", type=float, help="Mean-field deaths below which a row is clearly extinct (default: grid quantile)")
+    parser.add_argument("--high", type=float, help="Mean-field deaths above which a row is clearly catastrophic (default: grid quantile)")
+    parser.add_argument("--low-quantile", type=float, default=LOW_QUANTILE, help="Grid quantile used when --low is not given")
+    parser.add_argument("--high-quantile", type=float, default=HIGH_QUANTILE, help="Grid quantile used when --high is not given")
+    parser.add_argument("--screen-repeats", type=int, default=50, help="Repeats kept for screened rows")
+    parser.add_argument("--summary", type=str, help="aggregate_summary.csv to compare against the mean field")
+    parser.add_argument("--abs-tol", type=float, default=2.0)
+    parser.add_argument("--rel-tol", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    df = load_scenarios(args.scenarios)
+    os.makedirs("results/summaries", exist_ok=True)
+
+    screened = screen_scenarios(df, args.low, args.high, args.screen_repeats, args.low_quantile, args.high_quantile)
+    screened.to_csv("results/summaries/mean_field_screen.csv", index=False)
+    low, high = screen_thresholds(screened["mean_field_deaths"], args.low, args.high, args.low_quantile, args.high_quantile)
+    counts = screened["screen"].value_counts()
+    print(f"Mean-field screen of {len(df)} rows (low={low:.1f}, high={high:.1f} deaths): " + ", ".join(f"{k}={v}" for k, v in counts.items()))
+    saved = (df["repeats"] - screened["repeats"]).sum()
+    print(f"Stochastic replicates saved by screening: {saved}")
+
+    if args.summary:
+        report = divergence_report(pd.read_csv(args.summary), df, args.abs_tol, args.rel_tol)
+        report.to_csv("results/summaries/mean_field_divergence.csv", index=False)
+        print(f"{report['diverges'].sum()} of {len(report)} rows diverge from the mean field; "
+              f"see results/summaries/mean_field_divergence.csv")
+
+if __name__ == "__main__":
+    main()
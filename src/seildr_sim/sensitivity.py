@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+sensitivity.py — Global (Sobol) sensitivity analysis of SEILDR parameters
+
+Description:
+---------------------------------------
+Estimates which parameters drive cumulative deaths without hand-written
+scenario grids:
+
+1. A Saltelli design (scrambled Sobol sequence, N * (k + 2) points) is drawn
+   over the parameter bounds.
+2. Each design point is simulated with an adaptive number of replicates:
+   every point starts with `min_reps` and receives further batches while the
+   standard error of its mean final deaths exceeds `se_tol`, up to `max_reps`
+   and within a total replicate budget. The noisiest points are served first.
+3. Replicate outcomes are cached per design point on disk, so re-running or
+   enlarging a design only simulates what is missing.
+4. First-order (Saltelli 2010) and total-order (Jansen) indices are reported
+   with bootstrap confidence intervals.
+
+Usage example:
+---------------------------------------
+    python -m seildr_sim.sensitivity --n-base 64 --budget 100000 --cores 10
+
+Output:
+---------------------------------------
+- results/summaries/sensitivity_indices.csv
+- results/summaries/sensitivity_design.csv
+- results/cache/sensitivity/*.npy (per design point final deaths)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from multiprocessing import Pool
+from scipy.stats import qmc
+from seildr_sim.core_model import single_run
+
+# ---------------------------------------
+# Parameter space
+# ---------------------------------------
+PARAMETER_BOUNDS = {
+    "beta_within": (0.0, 0.6),
+    "beta_cross": (0.0, 0.05),
+    "mortality_rate": (0.05, 0.9),
+    "reactivation_daily_p": (0.0, 0.001),
+    "initial_latent": (0, 50),
+    "initial_infectious": (0, 15)
+}
+
+INTEGER_PARAMETERS = {"initial_latent", "initial_infectious"}
+
+# Order expected by core_model.single_run (days appended last)
+MODEL_ORDER = [
+    "initial_infectious", "initial_latent", "beta_within", "beta_cross",
+    "mortality_rate", "reactivation_daily_p"
+]
+
+DEFAULTS = {
+    "initial_infectious": 7,
+    "initial_latent": 30,
+    "beta_within": 0.1,
+    "beta_cross": 0.02,
+    "mortality_rate": 0.15,
+    "reactivation_daily_p": 1/3650
+}
+
+# ---------------------------------------
+# Design
+# ---------------------------------------
+
+def saltelli_design(n_base, bounds, seed=None):
+    """
+    Builds the Saltelli sample matrices A, B and AB_i.
+
+    Returns:
+        pandas.DataFrame: n_base * (k + 2) rows with a `block` column
+        ("A", "B" or the parameter name swapped in from B) and a `row`
+        column indexing the base sample.
+    """
+    names = list(bounds)
+    k = len(names)
+    lower = np.array([bounds[n][0] for n in names], dtype=float)
+    upper = np.array([bounds[n][1] for n in names], dtype=float)
+
+    sobol = qmc.Sobol(d=2 * k, scramble=True, seed=seed)
+    base = sobol.random(n_base)
+    A = qmc.scale(base[:, :k], lower, upper)
+    B = qmc.scale(base[:, k:], lower, upper)
+
+    blocks = [("A", A), ("B", B)]
+    for i, name in enumerate(names):
+        AB = A.copy()
+        AB[:, i] = B[:, i]
+        blocks.append((name, AB))
+
+    frames = []
+    for label, matrix in blocks:
+        frame = pd.DataFrame(matrix, columns=names)
+        frame.insert(0, "block", label)
+        frame.insert(1, "row", np.arange(n_base))
+        frames.append(frame)
+    design = pd.concat(frames, ignore_index=True)
+
+    for name in names:
+        if name in INTEGER_PARAMETERS:
+            design[name] = design[name].round().astype(int)
+    return design
+
+# ---------------------------------------
+# Replicate cache
+# ---------------------------------------
+
+def _point_params(point, design):
+    params = {name: point[name] if name in design else DEFAULTS[name] for name in MODEL_ORDER}
+    for name in INTEGER_PARAMETERS:
+        params[name] = int(params[name])
+    return params
+
+def _point_key(point, days):
+    payload = json.dumps({name: round(float(point[name]), 12) for name in MODEL_ORDER} | {"days": days}, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+def _load_cached(cache_dir, key):
+    path = os.path.join(cache_dir, f"{key}.npy")
+    return np.load(path) if os.path.exists(path) else np.empty(0, dtype=np.int32)
+
+def _store_cached(cache_dir, key, values):
+    path = os.path.join(cache_dir, f"{key}.npy")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, values.astype(np.int32))
+    os.replace(tmp, path)
+
+def _final_deaths(params, seed):
+    return int(np.sum(single_run(params, seed)))
+
+# ---------------------------------------
+# Adaptive evaluation
+# ---------------------------------------
+
+def evaluate_design(
+    design,
+    days=1095,
+    budget=100000,
+    min_reps=20,
+    max_reps=400,
+    batch=20,
+    se_tol=1.0,
+    n_cores=10,
+    cache_dir="results/cache/sensitivity",
+    seed=None
+):
+    """
+    Simulates every distinct design point until its mean final deaths has a
+    standard error below se_tol, it reaches max_reps, or the budget of new
+    replicates is spent.
+
+    Replicate j of a point is always seeded with (seed, point key, j), so
+    cached and freshly simulated replicates never overlap.
+
+    Returns:
+        pandas.DataFrame: design with `mean_deaths`, `se_deaths` and `n_reps`.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    entropy = np.random.SeedSequence(seed).entropy
+
+    points = {}
+    for _, point in design.iterrows():
+        params = _point_params(point, design)
+        key = _point_key(params, days)
+        points.setdefault(key, params)
+
+    outcomes = {key: _load_cached(cache_dir, key) for key in points}
+    spent = 0
+
+    def standard_error(values):
+        return np.std(values, ddof=1) / np.sqrt(len(values)) if len(values) > 1 else np.inf
+
+    with Pool(processes=n_cores) as pool:
+        while spent < budget:
+            requests = {}
+            for key, values in outcomes.items():
+                if len(values) < min_reps:
+                    requests[key] = min_reps - len(values)
+                elif len(values) < max_reps and standard_error(values) > se_tol:
+                    requests[key] = min(batch, max_reps - len(values))
+            if not requests:
+                break
+
+            # Noisiest points first when the budget cannot cover every request
+            order = sorted(requests, key=lambda k: -standard_error(outcomes[k]))
+            tasks, owners = [], []
+            for key in order:
+                n_new = min(requests[key], budget - spent - len(tasks))
+                if n_new <= 0:
+                    break
+                params = tuple(points[key][name] for name in MODEL_ORDER) + (days,)
+                n_have = len(outcomes[key])
+                for j in range(n_have, n_have + n_new):
+                    tasks.append((params, np.random.SeedSequence(entropy, spawn_key=(int(key, 16), j))))
+                    owners.append(key)
+
+            finals = pool.starmap(_final_deaths, tasks)
+            spent += len(tasks)
+
+            new_values = {}
+            for key, value in zip(owners, finals):
+                new_values.setdefault(key, []).append(value)
+            for key, values in new_values.items():
+                outcomes[key] = np.concatenate([outcomes[key], values])
+                _store_cached(cache_dir, key, outcomes[key])
+
+            print(f"Simulated {spent}/{budget} replicates; {len(requests)} design points still refining")
+
+    evaluated = design.copy()
+    keys = [_point_key(_point_params(point, design), days) for _, point in design.iterrows()]
+    evaluated["mean_deaths"] = [np.mean(outcomes[k]) if len(outcomes[k]) else np.nan for k in keys]
+    evaluated["se_deaths"] = [standard_error(outcomes[k]) for k in keys]
+    evaluated["n_reps"] = [len(outcomes[k]) for k in keys]
+    return evaluated
+
+# ---------------------------------------
+# Sobol indices
+# ---------------------------------------
+
+def _sobol_estimates(fA, fB, fAB):
+    variance = np.var(np.concatenate([fA, fB]), ddof=1)
+    first = np.mean(fB * (fAB - fA), axis=1) / variance
+    total = 0.5 * np.mean((fA - fAB) ** 2, axis=1) / variance
+    return first, total
+
+def sobol_indices(evaluated, names, n_bootstrap=1000, confidence=0.95, seed=None):
+    """
+    First-order and total-order indices from an evaluated Saltelli design.
+
+    Returns:
+        pandas.DataFrame: one row per parameter with S1/ST and bootstrap bounds.
+    """
+    def block(label):
+        return evaluated[evaluated["block"] == label].sort_values("row")["mean_deaths"].to_numpy()
+
+    fA, fB = block("A"), block("B")
+    fAB = np.stack([block(name) for name in names])
+    first, total = _sobol_estimates(fA, fB, fAB)
+
+    rng = np.random.default_rng(seed)
+    n = len(fA)
+    boot_first = np.empty((n_bootstrap, len(names)))
+    boot_total = np.empty((n_bootstrap, len(names)))
+    for b in range(n_bootstrap):
+        idx = rng.integers(0, n, n)
+        boot_first[b], boot_total[b] = _sobol_estimates(fA[idx], fB[idx], fAB[:, idx])
+
+    alpha = (1 - confidence) / 2 * 100
+    return pd.DataFrame({
+        "parameter": names,
+        "S1": first,
+        "S1_lower": np.percentile(boot_first, alpha, axis=0),
+        "S1_upper": np.percentile(boot_first, 100 - alpha, axis=0),
+        "ST": total,
+        "ST_lower": np.percentile(boot_total, alpha, axis=0),
+        "ST_upper": np.percentile(boot_total, 100 - alpha, axis=0)
+    })
+
+# ---------------------------------------
+# CLI
+# ---------------------------------------
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Sobol sensitivity analysis of SEILDR cumulative deaths")
+    parser.add_argument("--parameters", type=str, default=",".join(PARAMETER_BOUNDS),
+                        help="Comma-separated parameters to vary (others stay at core_model defaults)")
+    parser.add_argument("--n-base", type=int, default=64, help="Base sample size N (power of 2)")
+    parser.add_argument("--days", type=int, default=1095)
+    parser.add_argument("--budget", type=int, default=100000, help="Maximum new replicates to simulate")
+    parser.add_argument("--min-reps", type=int, default=20)
+    parser.add_argument("--max-reps", type=int, default=400)
+    parser.add_argument("--batch", type=int, default=20, help="Replicates added per refinement step")
+    parser.add_argument("--se-tol", type=float, default=1.0, help="Target standard error of mean deaths")
+    parser.add_argument("--bootstrap", type=int, default=1000)
+    parser.add_argument("--cores", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache", type=str, default="results/cache/sensitivity")
+    args = parser.parse_args(argv)
+
+    names = args.parameters.split(",")
+    unknown = set(names) - set(PARAMETER_BOUNDS)
+    if unknown:
+        parser.error(f"Unknown parameters: {sorted(unknown)}")
+    bounds = {name: PARAMETER_BOUNDS[name] for name in names}
+
+    design = saltelli_design(args.n_base, bounds, seed=args.seed)
+    print(f"Saltelli design: {len(design)} points over {len(names)} parameters")
+
+    evaluated = evaluate_design(
+        design, days=args.days, budget=args.budget, min_reps=args.min_reps,
+        max_reps=args.max_reps, batch=args.batch, se_tol=args.se_tol,
+        n_cores=args.cores, cache_dir=args.cache, seed=args.seed
+    )
+    if evaluated["mean_deaths"].isna().any():
+        raise SystemExit("Budget exhausted before every design point had a replicate; raise --budget")
+
+    indices = sobol_indices(evaluated, names, n_bootstrap=args.bootstrap, seed=args.seed)
+
+    os.makedirs("results/summaries", exist_ok=True)
+    evaluated.to_csv("results/summaries/sensitivity_design.csv", index=False)
+    indices.to_csv("results/summaries/sensitivity_indices.csv", index=False)
+    print("\nSobol indices:\n", indices.round(3).to_string(index=False))
+    print("\nSaved results/summaries/sensitivity_indices.csv")
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,9 @@ Usage examples:
 Output:
 ---------------------------------------
 - Stores .npy files into /results/
+- Optionally streams per-aviary S/E/I/L/D trajectories to a memory-mapped .npy (--record)
+- Optional time-varying interventions (--intervention 60:isolation_only) and
+  branch comparisons of start days forked from one baseline (--branch_days 30,60,90)
 - Logs run details into /logs/simulation.log
 """
 
@@ -30,14 +33,7 @@ import argparse
 import numpy as np
 import os
 import logging
-from seildr_sim.core_model import run_simulation
-
-# Create output and logs directories if missing
-os.makedirs("results", exist_ok=True)
-os.makedirs("logs", exist_ok=True)
-
-logging.basicConfig(filename="logs/simulation.log", level=logging.INFO,
-                    format="%(asctime)s - %(levelname)s - %(message)s")
+from seildr_sim.core_model import run_simulation, run_branches
 
 # Management scenario mapping (consistent with full batch pipeline)
 SCENARIOS = {
@@ -53,8 +49,8 @@ def interactive_input(prompt, default, cast_fn):
     except:
         return default
 
-def main():
-    parser = argparse.ArgumentParser(description="Run SEILDR simulation for Pacheco's Disease")
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Run SEILDR simulation for Pacheco's Disease")
     parser.add_argument("--scenario", type=str, choices=SCENARIOS.keys(), help="Management scenario")
     parser.add_argument("--initial_infectious", type=int, help="Initial infectious birds")
     parser.add_argument("--initial_latent", type=int, help="Initial latent carriers")
@@ -64,8 +60,35 @@ def main():
     parser.add_argument("--days", type=int, help="Number of days")
     parser.add_argument("--cores", type=int, help="CPU cores to use (max 10)")
     parser.add_argument("--output", type=str, help="Optional manual output file")
-
-    args = parser.parse_args()
+    parser.add_argument("--record", type=str, help="Optional .npy path for per-aviary S/E/I/L/D trajectories")
+    parser.add_argument("--record_every", type=int, help="Record every n-th day (default 1)")
+    parser.add_argument("--record_aviaries", type=str, help="Comma-separated aviary indices to record (default all)")
+    parser.add_argument("--intervention", type=str, action="append",
+                        help="Switch to a scenario's transmission rates from a given day, as DAY:SCENARIO (repeatable)")
+    parser.add_argument("--branch_days", type=str,
+                        help="Comma-separated intervention start days to compare, forked from one shared baseline run")
+    parser.add_argument("--branch_scenario", type=str, choices=SCENARIOS.keys(),
+                        help="Scenario adopted on each branch day (default isolation_only)")
+
+    args = parser.parse_args(argv)
+
+    # Create output and logs directories if missing
+    os.makedirs("results", exist_ok=True)
+    os.makedirs("logs", exist_ok=True)
+
+    logging.basicConfig(filename="logs/simulation.log", level=logging.INFO,
+                        format="%(asctime)s - %(levelname)s - %(message)s")
+
+    record = args.record
+    record_every = args.record_every or 1
+    record_aviaries = [int(a) for a in args.record_aviaries.split(",")] if args.record_aviaries else None
+
+    schedule = []
+    for item in args.intervention or []:
+        day, _, name = item.partition(":")
+        if name not in SCENARIOS:
+            parser.error(f"Unknown scenario in --intervention {item}")
+        schedule.append((int(day), SCENARIOS[name]))
 
     if not any(vars(args).values()):
         print("\n--- Interactive Mode ---\n")
@@ -101,6 +124,8 @@ def main():
     beta_cross = SCENARIOS[scenario]["beta_cross"]
 
     logging.info(f"Scenario: {scenario}")
+    if schedule:
+        logging.info(f"Intervention schedule: {schedule}")
     logging.info(f"Parameters: Infectious={initial_infectious}, Latent={initial_latent}, "
                  f"Mortality={mortality}, Reactivation={reactivation}, "
                  f"beta_within={beta_within}, beta_cross={beta_cross}, "
@@ -108,6 +133,37 @@ def main():
 
     print(f"\nRunning scenario: {scenario} using {cores} cores...")
 
+    if args.branch_days:
+        branch_scenario = args.branch_scenario or "isolation_only"
+        variants = {
+            f"{branch_scenario}_d{int(day)}": [(int(day), SCENARIOS[branch_scenario])]
+            for day in args.branch_days.split(",")
+        }
+        logging.info(f"Branching {list(variants)} from a shared {scenario} baseline")
+
+        branches = run_branches(
+            variants,
+            initial_infectious=initial_infectious,
+            initial_latent=initial_latent,
+            beta_within=beta_within,
+            beta_cross=beta_cross,
+            mortality_rate=mortality,
+            reactivation_daily_p=reactivation,
+            repeats=repeats,
+            days=days,
+            n_cores=cores
+        )
+
+        stem = os.path.splitext(output)[0]
+        for name, results in branches.items():
+            outfile = output if name == "baseline" else f"{stem}_{name}.npy"
+            np.save(outfile, results)
+            final = np.sum(results, axis=1)
+            interval = np.percentile(final, [2.5, 97.5])
+            print(f"{name}: final cumulative deaths {np.mean(final):.1f} [{interval[0]:.1f} - {interval[1]:.1f}] -> {outfile}")
+        logging.info(f"Branching complete. Baseline saved to {output}")
+        return
+
     results = run_simulation(
         initial_infectious=initial_infectious,
         initial_latent=initial_latent,
@@ -117,11 +173,17 @@ def main():
         reactivation_daily_p=reactivation,
         repeats=repeats,
         days=days,
-        n_cores=cores
+        n_cores=cores,
+        record_path=record,
+        record_every=record_every,
+        record_aviaries=record_aviaries,
+        schedule=schedule
     )
 
     np.save(output, results)
     logging.info(f"Simulation complete. Saved to {output}")
+    if record:
+        logging.info(f"Trajectories recorded to {record} (every {record_every} days)")
 
     cumulative = np.cumsum(results, axis=1)
     final_mean = np.mean(cumulative[:, -1])
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+work_queue.py — Multi-node batch execution over a shared-directory work queue
+
+Description:
+---------------------------------------
+Spreads the scenarios.csv grid over any number of worker processes on any
+number of hosts that can see the same (e.g. NFS) directory. No scheduler is
+required; all coordination happens through atomic file renames.
+
+- The coordinator splits every scenario row into replicate chunks and writes
+  one JSON task file per chunk into <queue>/tasks/pending/.
+- A worker claims a task by renaming it into <queue>/tasks/leased/ and keeps
+  the lease alive by touching the file while it simulates.
+- Leases whose file has not been touched for `lease_seconds` are moved back
+  to pending, so work from crashed or disconnected workers is re-run.
+- Finished chunks (daily deaths plus event metrics) are written to
+  <queue>/chunks/ and, once every chunk of a scenario is present, merged
+  atomically into results/<scenario file>.npy, its _events.npy and
+  _meta.json, exactly as batch_scenario_runner.py writes them.
+
+Each chunk carries its own seed, so re-running an expired chunk reproduces
+the same replicates and duplicated work is harmless.
+
+Usage examples:
+---------------------------------------
+1. Enqueue the scenario grid (once, on any host):
+    python -m seildr_sim.work_queue enqueue /shared/seildr_queue --chunk-size 250
+
+2. Start workers (on as many hosts as you like):
+    python -m seildr_sim.work_queue work /shared/seildr_queue --cores 8
+
+3. Re-queue expired leases and merge finished scenarios into results/:
+    python -m seildr_sim.work_queue monitor /shared/seildr_queue
+
+4. Inspect progress:
+    python -m seildr_sim.work_queue status /shared/seildr_queue
+
+Notes:
+---------------------------------------
+- Lease expiry compares file mtimes against the local clock; keep
+  `--lease` well above any clock skew between hosts.
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import threading
+import time
+import numpy as np
+from seildr_sim.core_model import run_simulation, precision_info
+from seildr_sim.batch_scenario_runner import (
+    load_scenarios, row_to_params, result_filename, events_filename, run_metadata
+)
+
+PENDING = os.path.join("tasks", "pending")
+LEASED = os.path.join("tasks", "leased")
+DONE = os.path.join("tasks", "done")
+CHUNKS = "chunks"
+MERGED = "merged"
+MANIFEST = "manifest.json"
+
+# ---------------------------------------
+# Filesystem helpers
+# ---------------------------------------
+
+def _worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+def _atomic_write_json(path, payload):
+    tmp = f"{path}.{_worker_id()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(payload, f, indent=2, allow_nan=False)
+    os.replace(tmp, path)
+
+def _atomic_save_npy(path, array):
+    tmp = f"{path}.{_worker_id()}.tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+def _list_tasks(queue_dir, state):
+    folder = os.path.join(queue_dir, state)
+    return sorted(name for name in os.listdir(folder) if name.endswith(".json"))
+
+def _queue_files(queue_dir):
+    # Every task, chunk, merge marker and the manifest left by an earlier run
+    paths = [os.path.join(queue_dir, MANIFEST)] if os.path.exists(os.path.join(queue_dir, MANIFEST)) else []
+    for folder in (PENDING, LEASED, DONE, CHUNKS, MERGED):
+        paths += [os.path.join(queue_dir, folder, name) for name in os.listdir(os.path.join(queue_dir, folder))]
+    return paths
+
+def _load_manifest(queue_dir):
+    with open(os.path.join(queue_dir, MANIFEST)) as f:
+        return json.load(f)
+
+# ---------------------------------------
+# Coordinator
+# ---------------------------------------
+
+def enqueue(queue_dir, df, chunk_size=250, seed=None, lease_seconds=900, reset=False):
+    """
+    Writes one pending task per (scenario row, replicate chunk).
+
+    A queue directory holding anything from an earlier run (tasks, chunks,
+    merge markers or a manifest) is refused unless reset=True, which deletes
+    it first; stale markers would otherwise stop the new run from merging.
+
+    Returns:
+        int: number of tasks enqueued.
+    """
+    for folder in (PENDING, LEASED, DONE, CHUNKS, MERGED):
+        os.makedirs(os.path.join(queue_dir, folder), exist_ok=True)
+
+    leftovers = _queue_files(queue_dir)
+    if leftovers and not reset:
+        raise RuntimeError(f"Queue at {queue_dir} holds {len(leftovers)} files from an earlier run; use --reset to discard them")
+    for path in leftovers:
+        os.remove(path)
+
+    entropy = np.random.SeedSequence(seed).entropy
+    groups = {}
+    n_tasks = 0
+
+    for g, (_, row) in enumerate(df.iterrows()):
+        params = row_to_params(row)
+        if params is None:
+            print(f"Skipping unknown scenario '{row['scenario']}'")
+            continue
+
+        repeats = params.pop("repeats")
+        params.pop("n_cores")
+        group = os.path.splitext(result_filename(
+            row["scenario"], params["mortality_rate"],
+            params["initial_infectious"], params["initial_latent"]
+        ))[0]
+        n_chunks = max(1, -(-repeats // chunk_size))
+        groups[group] = {
+            "output": f"{group}.npy",
+            "n_chunks": n_chunks,
+            "scenario": row["scenario"],
+            "params": {**params, "repeats": repeats}
+        }
+
+        for k in range(n_chunks):
+            task_id = f"{g:04d}_{k:04d}"
+            task = {
+                "task_id": task_id,
+                "group": group,
+                "chunk": k,
+                "params": params,
+                "repeats": min(chunk_size, repeats - k * chunk_size),
+                "seed": {"entropy": entropy, "spawn_key": [g, k]}
+            }
+            _atomic_write_json(os.path.join(queue_dir, PENDING, f"{task_id}.json"), task)
+            n_tasks += 1
+
+    _atomic_write_json(os.path.join(queue_dir, MANIFEST), {
+        "lease_seconds": lease_seconds,
+        "groups": groups
+    })
+    return n_tasks
+
+def reap_expired(queue_dir, lease_seconds):
+    """
+    Moves leased tasks whose heartbeat is older than lease_seconds back to pending.
+    """
+    requeued = []
+    now = time.time()
+    for name in _list_tasks(queue_dir, LEASED):
+        leased = os.path.join(queue_dir, LEASED, name)
+        try:
+            expired = now - os.path.getmtime(leased) > lease_seconds
+            if expired:
+                os.rename(leased, os.path.join(queue_dir, PENDING, name))
+                requeued.append(name)
+        except FileNotFoundError:
+            # Finished or reaped by someone else in the meantime
+            continue
+    return requeued
+
+def merge_completed(queue_dir, results_dir="results"):
+    """
+    Concatenates the chunks of every fully finished scenario into results_dir.
+
+    Chunks are merged in chunk order into the daily deaths, event metrics and
+    run metadata files, each written through a temporary file plus
+    os.replace, so readers never observe a partially written result.
+    """
+    manifest = _load_manifest(queue_dir)
+    os.makedirs(results_dir, exist_ok=True)
+    merged = []
+
+    for group, spec in manifest["groups"].items():
+        marker = os.path.join(queue_dir, MERGED, group)
+        if os.path.exists(marker):
+            continue
+
+        chunk_paths = [os.path.join(queue_dir, CHUNKS, f"{group}_{k:04d}.npy") for k in range(spec["n_chunks"])]
+        if not all(os.path.exists(p) and os.path.exists(events_filename(p)) for p in chunk_paths):
+            continue
+
+        results = np.concatenate([np.load(p) for p in chunk_paths], axis=0)
+        events = np.concatenate([np.load(events_filename(p)) for p in chunk_paths])
+        outfile = os.path.join(results_dir, spec["output"])
+        _atomic_save_npy(outfile, results)
+        _atomic_save_npy(events_filename(outfile), events)
+
+        info = precision_info(np.sum(results, axis=1), events["extinction_day"] >= 0, faded=events["fadeout_day"] >= 0)
+        _atomic_write_json(outfile[:-len(".npy")] + "_meta.json", run_metadata(spec["scenario"], spec["params"], info))
+        open(marker, "w").close()
+        merged.append(spec["output"])
+
+    return merged
+
+def queue_status(queue_dir):
+    manifest = _load_manifest(queue_dir)
+    return {
+        "pending": len(_list_tasks(queue_dir, PENDING)),
+        "leased": len(_list_tasks(queue_dir, LEASED)),
+        "done": len(_list_tasks(queue_dir, DONE)),
+        "merged": len(os.listdir(os.path.join(queue_dir, MERGED))),
+        "scenarios": len(manifest["groups"])
+    }
+
+def monitor(queue_dir, results_dir="results", poll_seconds=10):
+    """
+    Re-queues expired leases and merges finished scenarios until the queue drains.
+    """
+    lease_seconds = _load_manifest(queue_dir)["lease_seconds"]
+    while True:
+        for name in reap_expired(queue_dir, lease_seconds):
+            print(f"Lease expired, re-queued: {name}")
+        for output in merge_completed(queue_dir, results_dir):
+            print(f"Merged: {os.path.join(results_dir, output)}")
+
+        status = queue_status(queue_dir)
+        if status["merged"] == status["scenarios"]:
+            print(f"All {status['scenarios']} scenarios merged into {results_dir}/")
+            return
+        time.sleep(poll_seconds)
+
+# ---------------------------------------
+# Worker
+# ---------------------------------------
+
+def claim_task(queue_dir):
+    """
+    Atomically moves one pending task into leased/.
+
+    Returns:
+        (str, dict) | None: the leased path and task payload, or None if the
+        pending folder is empty.
+    """
+    names = _list_tasks(queue_dir, PENDING)
+    # Shuffle so that concurrent workers do not all race for the same file
+    random.shuffle(names)
+    for name in names:
+        pending = os.path.join(queue_dir, PENDING, name)
+        leased = os.path.join(queue_dir, LEASED, name)
+        try:
+            # rename keeps the mtime, so start the lease clock before the
+            # move; otherwise a fresh lease could look expired to reap_expired
+            os.utime(pending)
+            os.rename(pending, leased)
+            os.utime(leased)
+            with open(leased) as f:
+                return leased, json.load(f)
+        except FileNotFoundError:
+            # Claimed by another worker, or reaped back to pending meanwhile
+            continue
+    return None
+
+def _heartbeat(leased, interval, stop):
+    while not stop.wait(interval):
+        try:
+            os.utime(leased)
+        except FileNotFoundError:
+            # Lease was reaped; the result is still valid if we finish
+            return
+
+def complete_task(queue_dir, leased, task, results, events):
+    chunk_path = os.path.join(queue_dir, CHUNKS, f"{task['group']}_{task['chunk']:04d}.npy")
+    # Events first: merge_completed treats the deaths chunk as the commit point
+    _atomic_save_npy(events_filename(chunk_path), events)
+    _atomic_save_npy(chunk_path, results)
+    name = os.path.basename(leased)
+    for source in (leased, os.path.join(queue_dir, PENDING, name)):
+        try:
+            os.rename(source, os.path.join(queue_dir, DONE, name))
+            return
+        except FileNotFoundError:
+            continue
+
+def work(queue_dir, n_cores=None, poll_seconds=5, max_tasks=None):
+    """
+    Claims and runs tasks until nothing is pending or leased.
+
+    Returns:
+        int: number of tasks this worker completed.
+    """
+    lease_seconds = _load_manifest(queue_dir)["lease_seconds"]
+    n_cores = n_cores or os.cpu_count()
+    completed = 0
+
+    while max_tasks is None or completed < max_tasks:
+        claimed = claim_task(queue_dir)
+        if claimed is None:
+            reap_expired(queue_dir, lease_seconds)
+            if not _list_tasks(queue_dir, PENDING) and not _list_tasks(queue_dir, LEASED):
+                break
+            time.sleep(poll_seconds)
+            continue
+
+        leased, task = claimed
+        print(f"[{_worker_id()}] Running {task['group']} chunk {task['chunk']} ({task['repeats']} replicates)")
+
+        stop = threading.Event()
+        beat = threading.Thread(target=_heartbeat, args=(leased, lease_seconds / 3, stop), daemon=True)
+        beat.start()
+        try:
+            seed = np.random.SeedSequence(task["seed"]["entropy"], spawn_key=task["seed"]["spawn_key"])
+            results, events = run_simulation(
+                **task["params"],
+                repeats=task["repeats"],
+                n_cores=n_cores,
+                seed=seed,
+                output="both"
+            )
+        finally:
+            stop.set()
+            beat.join()
+
+        complete_task(queue_dir, leased, task, results, events)
+        completed += 1
+
+    return completed
+
+# ---------------------------------------
+# CLI
+# ---------------------------------------
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Shared-directory work queue for SEILDR batch runs")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("enqueue", help="Split scenarios.csv into chunked tasks")
+    p.add_argument("queue_dir")
+    p.add_argument("--scenarios", type=str, help="Scenario grid CSV (defaults to packaged scenarios.csv)")
+    p.add_argument("--chunk-size", type=int, default=250, help="Replicates per task")
+    p.add_argument("--seed", type=int, help="Base seed for reproducible chunks")
+    p.add_argument("--lease", type=float, default=900, help="Lease duration in seconds")
+    p.add_argument("--reset", action="store_true", help="Discard tasks, chunks and merge markers of an earlier run")
+    p.add_argument("--screen", action="store_true",
+                   help="Cap replicates of rows the mean-field engine marks clearly extinct or catastrophic")
+    p.add_argument("--screen-repeats", type=int, default=50, help="Repeats kept for screened rows")
+
+    p = sub.add_parser("work", help="Claim and run tasks until the queue is empty")
+    p.add_argument("queue_dir")
+    p.add_argument("--cores", type=int, help="CPU cores per task (defaults to all)")
+    p.add_argument("--poll", type=float, default=5, help="Seconds to wait when no task is available")
+    p.add_argument("--max-tasks", type=int, help="Exit after this many tasks")
+
+    p = sub.add_parser("monitor", help="Re-queue expired leases and merge results until done")
+    p.add_argument("queue_dir")
+    p.add_argument("--results", type=str, default="results", help="Directory for merged .npy files")
+    p.add_argument("--poll", type=float, default=10)
+
+    p = sub.add_parser("merge", help="Merge finished scenarios once and exit")
+    p.add_argument("queue_dir")
+    p.add_argument("--results", type=str, default="results")
+
+    p = sub.add_parser("status", help="Print queue counts")
+    p.add_argument("queue_dir")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "enqueue":
+        df = load_scenarios(args.scenarios)
+        if args.screen:
+            from seildr_sim.screening import screen_scenarios
+            df = screen_scenarios(df, screen_repeats=args.screen_repeats)
+        n_tasks = enqueue(args.queue_dir, df, args.chunk_size, args.seed, args.lease, args.reset)
+        print(f"Enqueued {n_tasks} tasks in {args.queue_dir}")
+    elif args.command == "work":
+        completed = work(args.queue_dir, args.cores, args.poll, args.max_tasks)
+        print(f"[{_worker_id()}] Completed {completed} tasks")
+    elif args.command == "monitor":
+        monitor(args.queue_dir, args.results, args.poll)
+    elif args.command == "merge":
+        for output in merge_completed(args.queue_dir, args.results):
+            print(f"Merged: {os.path.join(args.results, output)}")
+    elif args.command == "status":
+        for key, value in queue_status(args.queue_dir).items():
+            print(f"{key}: {value}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+Parameter-batched engine: chunk layout and edge cases.
+"""
+
+import numpy as np
+
+from seildr_sim.core_model import run_batched, BATCH_CHUNK_PAIRS
+
+def _param_set(repeats, **overrides):
+    params = dict(initial_infectious=2, initial_latent=10, beta_within=0.5, beta_cross=0.02,
+                  mortality_rate=0.3, reactivation_daily_p=0.00027, repeats=repeats, days=30)
+    params.update(overrides)
+    return params
+
+def test_results_do_not_depend_on_core_count():
+    param_sets = [_param_set(BATCH_CHUNK_PAIRS), _param_set(5, mortality_rate=0.6), _param_set(3, days=20)]
+    two = run_batched(param_sets, seed=1, n_cores=2)
+    three = run_batched(param_sets, seed=1, n_cores=3)
+    for (deaths_a, metrics_a), (deaths_b, metrics_b) in zip(two, three):
+        assert np.array_equal(deaths_a, deaths_b)
+        assert np.array_equal(metrics_a, metrics_b)
+    assert [d.shape for d, _ in two] == [(BATCH_CHUNK_PAIRS, 30), (5, 30), (3, 20)]
+
+def test_zero_repeat_sets():
+    (deaths, metrics), = run_batched([_param_set(0)], seed=1, n_cores=1)
+    assert deaths.shape == (0, 30) and len(metrics) == 0
+
+    results = run_batched([_param_set(0), _param_set(4)], seed=1, n_cores=1)
+    assert [d.shape for d, _ in results] == [(0, 30), (4, 30)]
@@ -0,0 +1,16 @@
+"""
+`seildr <command> --help` must not need the optional heavy dependencies.
+"""
+
+import sys
+
+import pytest
+
+from seildr_sim import cli
+
+def test_infer_help_does_not_import_pymc(capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main(["infer", "--help"])
+    assert exit_info.value.code == 0
+    assert capsys.readouterr().out.startswith("usage: seildr infer")
+    assert not {"pymc", "arviz"} & set(sys.modules)
@@ -0,0 +1,59 @@
+"""
+Agreement between the per-replicate, parameter-batched and mean-field engines.
+"""
+
+import numpy as np
+import pytest
+
+from seildr_sim.core_model import (
+    single_run, batch_chunk, run_simulation, run_batched, mean_field, EVENT_DTYPE
+)
+
+PARAMETER_NAMES = ("initial_infectious", "initial_latent", "beta_within", "beta_cross",
+                   "mortality_rate", "reactivation_daily_p")
+
+@pytest.mark.parametrize("params", [
+    (2, 10, 0.5, 0.02, 0.3, 0.00027, 400),
+    (6, 30, 0.05, 0.002, 0.8, 0.01, 400),
+    (10, 0, 0.2, 0.01, 0.1, 0.0, 400)
+])
+def test_single_pair_batch_reproduces_single_run(params):
+    # Same generator, same draw order: step_day and advance_day agree draw for draw
+    pairs = {name: np.array([value]) for name, value in zip(PARAMETER_NAMES, params)}
+    for seed in range(3):
+        deaths, metrics = single_run(params, seed=seed, return_metrics=True)
+        batch_deaths, batch_metrics = batch_chunk(pairs, params[-1], seed)
+        assert np.array_equal(batch_deaths[0], deaths)
+        assert tuple(batch_metrics[0]) == metrics
+
+def test_batched_matches_run_simulation_in_distribution():
+    params = dict(initial_infectious=2, initial_latent=10, beta_within=0.5, beta_cross=0.02,
+                  mortality_rate=0.3, reactivation_daily_p=0.00027, days=365)
+    n = 400
+    deaths, metrics = run_simulation(**params, repeats=n, n_cores=4, seed=1, output="both")
+    (batch_deaths, batch_metrics), = run_batched([{**params, "repeats": n}], seed=2, n_cores=4)
+
+    final, batch_final = deaths.sum(axis=1), batch_deaths.sum(axis=1)
+    assert np.allclose(np.quantile(final, [0.1, 0.5, 0.9]), np.quantile(batch_final, [0.1, 0.5, 0.9]), atol=3)
+
+    for field in EVENT_DTYPE.names:
+        a, b = metrics[field].astype(float), batch_metrics[field].astype(float)
+        if field in ("extinction_day", "fadeout_day"):
+            a, b = a >= 0, b >= 0
+        se = np.sqrt(a.var() / n + b.var() / n)
+        assert abs(a.mean() - b.mean()) <= 4 * se + 1e-9, field
+
+def test_mean_field_tracks_stochastic_mean():
+    # Well above the outbreak threshold stochastic fade-out is rare, so the
+    # mean field should sit close to the stochastic mean (it runs ~15% high
+    # because the exposure probability is concave in the infectious count)
+    params = dict(initial_infectious=10, initial_latent=10, beta_within=0.5, beta_cross=0.02,
+                  reactivation_daily_p=0.00027, days=365)
+    rates = [0.2, 0.5, 0.8]
+    param_sets = [{**params, "mortality_rate": m, "repeats": 300} for m in rates]
+    stochastic = np.array([d.sum(axis=1).mean() for d, _ in run_batched(param_sets, seed=3, n_cores=4)])
+    predicted = mean_field(**{k: params[k] for k in PARAMETER_NAMES if k in params},
+                           mortality_rate=rates, days=params["days"]).sum(axis=1)
+
+    assert np.all(np.abs(predicted - stochastic) <= 0.25 * stochastic)
+    assert np.all(np.diff(predicted) > 0) and np.all(np.diff(stochastic) > 0)
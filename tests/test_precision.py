@@ -0,0 +1,42 @@
+"""
+Precision mode: replicates stop once the target CI half-width is reached.
+"""
+
+import json
+
+import pandas as pd
+
+from seildr_sim.batch_scenario_runner import main as batch_main
+from seildr_sim.core_model import run_simulation
+
+def test_low_variance_row_stops_below_csv_repeats(tmp_path):
+    grid = pd.DataFrame({
+        "scenario": ["isolation_biosecurity"],
+        "initial_infectious": [2],
+        "initial_latent": [10],
+        "mortality": [0.1],
+        "reactivation": [0.00027],
+        "repeats": [3000],
+        "days": [365],
+        "cores": [2]
+    })
+    grid.to_csv(tmp_path / "scenarios.csv", index=False)
+
+    batch_main(["--scenarios", str(tmp_path / "scenarios.csv"), "--results", str(tmp_path / "results"),
+                "--precision", "1.0", "--min-repeats", "100"])
+
+    with open(tmp_path / "results" / "isolation_biosecurity_m0.1_i2_l10_meta.json") as f:
+        meta = json.load(f)
+    assert meta["converged"]
+    assert 100 <= meta["repeats"] < 3000
+    assert meta["ci_halfwidth"] <= 1.0
+
+def test_fadeout_precision_target():
+    _, info = run_simulation(
+        initial_infectious=2, initial_latent=10, beta_within=0.05, beta_cross=0.002,
+        mortality_rate=0.1, reactivation_daily_p=0.00027, repeats=2000, days=200, n_cores=2,
+        seed=1, fadeout_precision=0.1, min_repeats=50, batch_size=50, return_info=True
+    )
+    assert info["converged"] and info["fadeout_ci_halfwidth"] <= 0.1
+    assert info["repeats"] < 2000
+    assert 0 < info["fadeout_probability"] < 1
@@ -0,0 +1,42 @@
+"""
+Intervention schedules: forked branches and day validation.
+"""
+
+import pytest
+
+from seildr_sim.core_model import branch_run, init_state, single_run, simulate_days, normalize_schedule
+
+PARAMS = (2, 10, 0.5, 0.02, 0.3, 0.00027, 200)
+
+VARIANTS = {
+    "isolate_day0": [(0, {"beta_within": 0.2})],
+    "isolate_day30": [(30, {"beta_within": 0.2, "beta_cross": 0.01})],
+    "two_step": [(60, {"mortality_rate": 0.1}), (90, {"beta_within": 0.05})],
+    "last_day": [(199, {"beta_cross": 0.0})]
+}
+
+@pytest.mark.parametrize("seed", [0, 1, 7])
+def test_forks_equal_from_scratch_runs(seed):
+    outputs = branch_run(PARAMS, VARIANTS, seed=seed)
+    assert outputs["baseline"] == single_run(PARAMS, seed=seed)
+    for name, schedule in VARIANTS.items():
+        assert outputs[name] == single_run(PARAMS, seed=seed, schedule=schedule), name
+
+@pytest.mark.parametrize("day", [-1, 200, 365])
+def test_out_of_range_days_are_rejected(day):
+    schedule = [(day, {"beta_within": 0.2})]
+    with pytest.raises(ValueError):
+        normalize_schedule(schedule, days=200)
+    with pytest.raises(ValueError):
+        single_run(PARAMS, seed=0, schedule=schedule)
+    with pytest.raises(ValueError):
+        branch_run(PARAMS, {"late": schedule}, seed=0)
+
+def test_resume_rejects_past_changes():
+    state = init_state(2, 10, seed=0)
+    rates = dict(beta_within=0.5, beta_cross=0.02, mortality_rate=0.3, reactivation_daily_p=0.00027)
+    simulate_days(state, rates, 50)
+    with pytest.raises(ValueError):
+        simulate_days(state, rates, 100, [(20, {"beta_within": 0.2})])
+    simulate_days(state, rates, 100, [(50, {"beta_within": 0.2})])
+    assert rates["beta_within"] == 0.2
@@ -0,0 +1,35 @@
+"""
+Mean-field screening of scenario grids.
+"""
+
+import pandas as pd
+
+from seildr_sim.batch_scenario_runner import load_scenarios
+from seildr_sim.screening import screen_scenarios
+
+def _small_grid():
+    return pd.DataFrame({
+        "scenario": ["isolation_biosecurity", "isolation_biosecurity", "isolation_only", "do_nothing", "do_nothing"],
+        "initial_infectious": [2, 2, 6, 10, 10],
+        "initial_latent": [10, 10, 30, 50, 50],
+        "mortality": [0.1, 0.2, 0.4, 0.7, 0.8],
+        "reactivation": [0.00027] * 5,
+        "repeats": [3000] * 5,
+        "days": [365] * 5,
+        "cores": [1] * 5
+    })
+
+def test_default_thresholds_screen_both_tails():
+    screened = screen_scenarios(_small_grid(), screen_repeats=50)
+    assert screened["screen"].iloc[0] == "extinct"
+    assert screened["screen"].iloc[-1] == "catastrophic"
+    assert (screened.loc[screened["screen"] != "run", "repeats"] == 50).all()
+    assert (screened.loc[screened["screen"] == "run", "repeats"] == 3000).all()
+
+def test_explicit_thresholds_override_quantiles():
+    screened = screen_scenarios(_small_grid(), low=0.0, high=1e9)
+    assert (screened["screen"] == "run").all()
+
+def test_packaged_grid_is_screened_by_default():
+    screened = screen_scenarios(load_scenarios())
+    assert (screened["screen"] != "run").sum() > 0
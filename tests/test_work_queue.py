@@ -0,0 +1,111 @@
+"""
+Local multi-worker check of the shared-directory work queue.
+"""
+
+import json
+import os
+from multiprocessing import Process
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from seildr_sim.work_queue import enqueue, work, merge_completed, queue_status, claim_task, reap_expired
+
+GRID = pd.DataFrame({
+    "scenario": ["do_nothing", "isolation_only"],
+    "initial_infectious": [2, 3],
+    "initial_latent": [10, 20],
+    "mortality": [0.3, 0.5],
+    "reactivation": [0.00027, 0.00027],
+    "repeats": [7, 4],
+    "days": [40, 40],
+    "cores": [1, 1]
+})
+
+def _run_workers(queue_dir, n_workers):
+    workers = [Process(target=work, args=(str(queue_dir),), kwargs={"n_cores": 1, "poll_seconds": 0.1})
+               for _ in range(n_workers)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join(timeout=120)
+        assert w.exitcode == 0
+
+def _load(results_dir, stem):
+    return (np.load(os.path.join(results_dir, f"{stem}.npy")),
+            np.load(os.path.join(results_dir, f"{stem}_events.npy")))
+
+def test_multiple_workers_merge_reproducibly(tmp_path):
+    enqueue(tmp_path / "queue", GRID, chunk_size=2, seed=7)
+    _run_workers(tmp_path / "queue", 3)
+    merged = merge_completed(str(tmp_path / "queue"), str(tmp_path / "results"))
+
+    status = queue_status(str(tmp_path / "queue"))
+    assert status["pending"] == status["leased"] == 0
+    assert status["done"] == 6
+    assert sorted(merged) == ["do_nothing_m0.3_i2_l10.npy", "isolation_only_m0.5_i3_l20.npy"]
+
+    deaths, events = _load(tmp_path / "results", "do_nothing_m0.3_i2_l10")
+    assert deaths.shape == (7, 40)
+    assert np.array_equal(events["total_deaths"], deaths.sum(axis=1))
+    with open(tmp_path / "results" / "do_nothing_m0.3_i2_l10_meta.json") as f:
+        assert json.load(f)["repeats"] == 7
+
+    # The same seed through a single worker gives identical replicates
+    enqueue(tmp_path / "serial", GRID, chunk_size=2, seed=7)
+    work(str(tmp_path / "serial"), n_cores=1)
+    merge_completed(str(tmp_path / "serial"), str(tmp_path / "serial_results"))
+    for stem in ("do_nothing_m0.3_i2_l10", "isolation_only_m0.5_i3_l20"):
+        parallel, serial = _load(tmp_path / "results", stem), _load(tmp_path / "serial_results", stem)
+        assert np.array_equal(parallel[0], serial[0])
+        assert np.array_equal(parallel[1], serial[1])
+
+def test_enqueue_refuses_used_queue_without_reset(tmp_path):
+    queue_dir = tmp_path / "queue"
+    enqueue(queue_dir, GRID.iloc[:1], chunk_size=4, seed=1)
+    work(str(queue_dir), n_cores=1)
+    merge_completed(str(queue_dir), str(tmp_path / "results"))
+
+    with pytest.raises(RuntimeError):
+        enqueue(queue_dir, GRID.iloc[:1], chunk_size=4, seed=2)
+
+    n_tasks = enqueue(queue_dir, GRID.iloc[:1], chunk_size=4, seed=2, reset=True)
+    status = queue_status(str(queue_dir))
+    assert status == {"pending": n_tasks, "leased": 0, "done": 0, "merged": 0, "scenarios": 1}
+
+def test_claim_is_not_reaped_between_rename_and_touch(tmp_path, monkeypatch):
+    queue_dir = tmp_path / "queue"
+    enqueue(queue_dir, GRID.iloc[:1], chunk_size=4, seed=1, lease_seconds=60)
+    for task in (queue_dir / "tasks" / "pending").iterdir():
+        os.utime(task, (0, 0))   # enqueued long ago
+    real_rename = os.rename
+    reaped = []
+
+    def rename_then_reap(src, dst):
+        # An idle worker reaps right after our rename, before any touch
+        real_rename(src, dst)
+        if "leased" in str(dst):
+            reaped.extend(reap_expired(str(queue_dir), 60))
+
+    monkeypatch.setattr(os, "rename", rename_then_reap)
+    leased, _ = claim_task(str(queue_dir))
+    assert reaped == []
+    assert os.path.exists(leased)
+
+def test_claim_skips_task_reaped_after_rename(tmp_path, monkeypatch):
+    queue_dir = tmp_path / "queue"
+    enqueue(queue_dir, GRID.iloc[:1], chunk_size=2, seed=1)
+    real_rename = os.rename
+
+    def rename_then_vanish(src, dst):
+        # Simulate another worker moving the lease away right after our rename
+        real_rename(src, dst)
+        if "leased" in str(dst) and not hasattr(rename_then_vanish, "done"):
+            rename_then_vanish.done = True
+            os.remove(dst)
+
+    monkeypatch.setattr(os, "rename", rename_then_vanish)
+    claimed = claim_task(str(queue_dir))
+    assert claimed is not None
+    assert os.path.exists(claimed[0])